@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import queue
+import threading
+from typing import Optional
+
+# Transparent compression for the pipeline's csv files
+# A path ending in .gz, .bz2 or .xz (or an existing file starting with one of their magic numbers) is read
+# and written through the standard library codec, anything else is a plain file. The text is the same
+# either way, so callers only swap open() for open_text() and never decompress to disk first.
+# background=True runs the codec in its own thread: zlib, bz2 and lzma release the GIL while they work,
+# so the (de)compression overlaps with the csv parsing in the calling thread
+
+COMPRESSION_EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+
+# first bytes of a file in each format
+COMPRESSION_MAGIC = {"gzip": b"\x1f\x8b", "bz2": b"BZh", "xz": b"\xfd7zXZ\x00"}
+
+# gzip.open defaults to level 9, several times slower than zlib's default 6 for a file a few % smaller
+GZIP_LEVEL = 6
+
+# bytes handed between the threads at a time, and how many chunks can wait in between
+BACKGROUND_CHUNK = 1 << 20
+BACKGROUND_QUEUE = 8
+
+
+# the compression a path's extension asks for, None for a plain file
+def compression_from_extension(path: str) -> Optional[str]:
+    return COMPRESSION_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+# the path without its compression extension ("x.csv.gz" -> "x.csv")
+def strip_compression_extension(path: str) -> str:
+    root, ext = os.path.splitext(path)
+    return root if ext.lower() in COMPRESSION_EXTENSIONS else path
+
+# compression of an existing file, from its extension or else its magic bytes (a .csv that is really gzip)
+def detect_compression(path: str) -> Optional[str]:
+    compression = compression_from_extension(path)
+    if compression is not None:
+        return compression
+    try:
+        with open(path, mode="rb") as f:
+            head = f.read(max(len(magic) for magic in COMPRESSION_MAGIC.values()))
+    except OSError:
+        return None
+    for compression, magic in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def _open_binary(path: str, mode: str, compression: str):
+    if compression == "gzip":
+        return gzip.open(path, mode, compresslevel=GZIP_LEVEL)
+    if compression == "bz2":
+        return bz2.open(path, mode)
+    return lzma.open(path, mode)
+
+
+# raw stream that hands every write to a thread compressing into binary_file
+class _ThreadedWriter(io.RawIOBase):
+    def __init__(self, binary_file):
+        super().__init__()
+        self._file = binary_file
+        self._chunks: queue.Queue = queue.Queue(maxsize=BACKGROUND_QUEUE)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="compress", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            chunk = self._chunks.get()
+            if chunk is None:
+                return
+            # after an error keep taking chunks so the writer never blocks on a full queue
+            if self._error is None:
+                try:
+                    self._file.write(chunk)
+                except BaseException as exc:
+                    self._error = exc
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        if self._error is not None:
+            raise self._error
+        self._chunks.put(bytes(b))
+        return len(b)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            self._chunks.put(None)
+            self._thread.join()
+            self._file.close()
+        finally:
+            super().close()
+        if self._error is not None:
+            raise self._error
+
+
+# raw stream fed by a thread decompressing binary_file ahead of the reader
+class _ThreadedReader(io.RawIOBase):
+    def __init__(self, binary_file):
+        super().__init__()
+        self._file = binary_file
+        self._chunks: queue.Queue = queue.Queue(maxsize=BACKGROUND_QUEUE)
+        self._pending = memoryview(b"")
+        self._eof = False
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="decompress", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            while not self._stop:
+                chunk = self._file.read(BACKGROUND_CHUNK)
+                self._chunks.put(chunk)
+                if not chunk:
+                    return
+        except BaseException as exc:
+            self._chunks.put(exc)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        if not self._pending:
+            if self._eof:
+                return 0
+            chunk = self._chunks.get()
+            if isinstance(chunk, BaseException):
+                self._eof = True
+                raise chunk
+            if not chunk:
+                self._eof = True
+                return 0
+            self._pending = memoryview(chunk)
+        n = min(len(b), len(self._pending))
+        b[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            # a reader closed early: let the thread finish its current put and stop
+            self._stop = True
+            while self._thread.is_alive():
+                try:
+                    self._chunks.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            self._file.close()
+        finally:
+            super().close()
+
+
+# opens a csv file as utf-8 text (newline="", what the csv module wants), compressed or not
+# mode is "r" or "w". Reading detects the compression, writing takes it from the extension
+def open_text(path: str, mode: str = "r", background: bool = False):
+    if mode not in ("r", "w"):
+        raise ValueError(f"open_text mode must be 'r' or 'w', not {mode!r}")
+    compression = detect_compression(path) if mode == "r" else compression_from_extension(path)
+    if compression is None:
+        return open(path, mode=mode, newline="", encoding="utf-8")
+
+    binary = _open_binary(path, mode + "b", compression)
+    if background:
+        if mode == "r":
+            binary = io.BufferedReader(_ThreadedReader(binary), BACKGROUND_CHUNK)
+        else:
+            binary = io.BufferedWriter(_ThreadedWriter(binary), BACKGROUND_CHUNK)
+    return io.TextIOWrapper(binary, encoding="utf-8", newline="")
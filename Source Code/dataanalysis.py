@@ -5,7 +5,11 @@
 
 
 # EDA libraries 
+import os
+from datetime import date
 import pandas as pd
+
+import compressedio
 #import matplotlib.pyplot as plt
 # import seaborn as sns
 
@@ -95,18 +99,141 @@ plt.title("Total Transaction Amount by Merchant")
 
 CLEAN_FILE = "../datasets/synthetic_transactions_clean.csv"
 
-
-def analysis_demo():
+# the cleaning step can also write parquet or feather next to the csv (datacleaning.OUTPUT_FORMAT),
+# or one of those files per year/month under a directory (clean_csv(partitioned=True)),
+# or a compressed csv (datacleaning.OUTPUT_FILE ending in .gz, .bz2 or .xz)
+CLEAN_FILES = {
+    "parquet": "../datasets/synthetic_transactions_clean.parquet",
+    "feather": "../datasets/synthetic_transactions_clean.feather",
+    "partitioned": "../datasets/synthetic_transactions_clean",
+    "csv": CLEAN_FILE,
+}
+CLEAN_FILES.update({"csv" + ext: CLEAN_FILE + ext for ext in compressedio.COMPRESSION_EXTENSIONS})
+
+# columns the demo needs, the columnar formats only read these from disk
+ANALYSIS_COLUMNS = ["date", "merchant", "amount"]
+
+
+# the most recently written cleaned file (format, path), in case older runs left other formats behind
+def find_clean_file():
+    found = [(os.path.getmtime(path), fmt, path) for fmt, path in CLEAN_FILES.items() if os.path.exists(path)]
+    if not found:
+        raise FileNotFoundError(CLEAN_FILE)
+    _, fmt, path = max(found)
+    return fmt, path
+
+
+# date range bounds can be dates or ISO strings
+def _as_date(value):
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(value)
+
+
+# partition files under root that can hold rows between start and end (inclusive, None = open ended)
+# only the year=/month= directory names are checked, months outside the range are never opened
+def partition_files(root, start=None, end=None):
+    start, end = _as_date(start), _as_date(end)
+    files = []
+    for year_dir in sorted(os.listdir(root)):
+        if not year_dir.startswith("year="):
+            continue
+        year = int(year_dir[len("year="):])
+        for month_dir in sorted(os.listdir(os.path.join(root, year_dir))):
+            if not month_dir.startswith("month="):
+                continue
+            month = int(month_dir[len("month="):])
+            if start is not None and (year, month) < (start.year, start.month):
+                continue
+            if end is not None and (year, month) > (end.year, end.month):
+                continue
+            part_dir = os.path.join(root, year_dir, month_dir)
+            files.extend(os.path.join(part_dir, name) for name in sorted(os.listdir(part_dir)))
+    return files
+
+
+# one parquet or feather file as a pyarrow table, with only the given columns
+def _read_table(path, columns=None):
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return pq.read_table(path, columns=columns)
+    import pyarrow.feather as feather
+    return feather.read_table(path, columns=columns)
+
+
+# parquet/feather store the amount as exact integer cents (amount_cents), the file columns for the asked ones
+def _file_columns(columns):
+    if columns is None:
+        return None
+    return ["amount_cents" if name == "amount" else name for name in columns]
+
+
+# amount_cents back to float dollars, the same values read_csv gives for the csv's amount column
+def _amount_from_cents(df):
+    if "amount_cents" in df:
+        df = df.rename(columns={"amount_cents": "amount"})
+        df["amount"] = df["amount"] / 100
+    return df
+
+
+# loads the cleaned data with only the given columns, and only the rows from start to end (inclusive) if given
+# parquet/feather come back typed: datetime64 date, categorical merchant (dictionary encoded on disk), float amount
+# partitioned data only reads the months overlapping the range, rows come back grouped by month
+def load_clean_data(columns=None, start=None, end=None):
+    start, end = _as_date(start), _as_date(end)
+    fmt, path = find_clean_file()
+
+    # the date column is needed to filter, even when it isn't asked for
+    filtered = start is not None or end is not None
+    read_columns = columns
+    if filtered and columns is not None and "date" not in columns:
+        read_columns = list(columns) + ["date"]
+
+    if fmt.startswith("csv"):
+        # streamed through the codec, compressed csv is never unpacked to disk
+        with compressedio.open_text(path) as f:
+            df = pd.read_csv(f, usecols=read_columns)
+    elif fmt == "partitioned":
+        import pyarrow as pa
+        tables = [_read_table(part, _file_columns(read_columns)) for part in partition_files(path, start, end)]
+        if not tables:
+            return pd.DataFrame(columns=columns or ANALYSIS_COLUMNS)
+        df = _amount_from_cents(pa.concat_tables(tables).to_pandas(date_as_object=False))
+    else:
+        df = _amount_from_cents(_read_table(path, _file_columns(read_columns)).to_pandas(date_as_object=False))
+
+    if filtered:
+        dates = pd.to_datetime(df["date"])
+        keep = pd.Series(True, index=df.index)
+        if start is not None:
+            keep &= dates >= pd.Timestamp(start)
+        if end is not None:
+            keep &= dates <= pd.Timestamp(end)
+        df = df[keep].reset_index(drop=True)
+    if read_columns is not columns:
+        df = df[columns]
+    return df
+
+
+# start/end (dates or ISO strings, inclusive) limit the analysis to a date range
+def analysis_demo(start=None, end=None):
     print("\n=== TRANSACTION ANALYSIS DEMO ===\n")
+    if start is not None or end is not None:
+        print(f"Date range: {start or 'start'} to {end or 'end'}\n")
 
     # Load cleaned data
     try:
-        df = pd.read_csv(CLEAN_FILE)
+        df = load_clean_data(ANALYSIS_COLUMNS, start, end)
     except FileNotFoundError:
         print(f"Could not find cleaned file at: {CLEAN_FILE}")
         print("Run the cleaning step first.")
         return
 
+    # a range outside the data (or a file with no rows) leaves nothing to rank
+    if df.empty:
+        print("No transactions in range, nothing to analyze.\n")
+        return
+
     # Quick sanity checks
     print(f"Shape: {df.shape[0]} rows x {df.shape[1]} columns")
     print("\nColumns:", df.columns.tolist())
@@ -117,7 +244,7 @@ def analysis_demo():
     # Top merchants by average amount
     merchant_avg = (
         df
-        .groupby("merchant", as_index=False)["amount"]
+        .groupby("merchant", as_index=False, observed=True)["amount"]
         .mean()
         .sort_values(by="amount", ascending=False)
     )
@@ -125,7 +252,7 @@ def analysis_demo():
     # Top merchants by total amount
     merchant_total = (
         df
-        .groupby("merchant", as_index=False)["amount"]
+        .groupby("merchant", as_index=False, observed=True)["amount"]
         .sum()
         .sort_values(by="amount", ascending=False)
     )
@@ -4,55 +4,37 @@
 # In[268]:
 
 
+import contextlib
 import csv
+import functools
+import glob
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import os
 import re
-from datetime import datetime
-from typing import List, Dict, Optional
-
-# input/output files
+import shutil
+import sqlite3
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Tuple
+
+import compressedio
+import merchantcatalog
+from transactionstore import TransactionStore
+
+# input/output files, either can be compressed ("...csv.gz", ".bz2", ".xz", see compressedio)
 INPUT_FILE = "../datasets/synthetic_transactions.csv"
 OUTPUT_FILE = "../datasets/synthetic_transactions_clean.csv"
 
-# merchants match my base merchants from data creation
-BASE_MERCHANTS = {
-    #first 16 should all map to the key
-    "UBER": ["UBER", "Uber", "Uber Technologies", "UBER EATS", "UBER *TRIP"],
-    "STARBUCKS": ["Starbucks", "STARBUCKS", "Starbucks Coffee"],
-    "AMAZON": ["Amazon", "AMZN", "Amazon Marketplace"],
-    "WALMART": ["Walmart", "WAL-MART", "Walmart Supercenter"],
-    "TARGET": ["Target", "TARGET", "Target Store"],
-    "MCDONALDS": ["McDonalds", "McDonald's", "MCD"],
-    "SHELL": ["Shell", "Shell Oil", "SHELL GAS"],
-    "LYFT": ["Lyft", "LYFT RIDE"],
-    "SPOTIFY": ["Spotify", "SPOTIFY", "Spotify Pmnt"],
-    "NETFLIX": ["Netflix", "NETFLIX", "Netflix.com"],
-    "APPLE": ["Apple", "APPLE.COM/BILL", "Apple Services"],
-    "GOOGLE": ["Google", "GOOGLE *SERVICES", "Google Play"],
-    "DOORDASH": ["DoorDash", "DOORDASH", "DOORDASH*ORDER"],
-    "INSTACART": ["Instacart", "INSTACART"],
-    "AIRBNB": ["Airbnb", "AIRBNB", "AIRBNB PAY"],
-    "COSTCO": ["Costco", "COSTCO WHOLESALE"],
-    
-    #last three should just map to the name in the end
-    
-    # Restaurants
-    "OLIVE_GARDEN": ["Olive Garden"],
-    "CHIPOTLE": ["Chipotle"],
-    "PANDA_EXPRESS": ["Panda Express"],
-    "SUSHI_HOUSE": ["Sushi House"],
-
-    # Retail
-    "BEST_BUY": ["Best Buy"],
-    "HOME_DEPOT": ["Home Depot"],
-    "LOWES": ["LOWE'S"],
-    "MACYS": ["Macy's"],
-
-    # Service
-    "CITY_UTILITIES": ["City Utilities"],
-    "GYM_MEMBERSHIP": ["Gym Membership"],
-    "CAR_WASH_PRO": ["Car Wash Pro"],
-}
-
+# what clean_csv writes: the csv, or a typed columnar file through pyarrow (parquet or feather) next to it
+OUTPUT_FORMAT = "csv"
+OUTPUT_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
 
 # Date parsing and normalization
 # -----------------------------
@@ -89,38 +71,201 @@ _suffix_date_regex = re.compile(
     r"^(?P<mon>[A-Za-z]{3})\s+(?P<day>\d{1,2})(st|nd|rd|th)\s+(?P<year>\d{2})$"
 )
 
-# parse data with with datetime's dt which can automatically format all the other formats except for MMM Dth YY
-def parse_date(raw: str) -> Optional[str]:
-    s = str(raw).strip()
+# the same field patterns strptime builds for %d, %m and %b (see _strptime.TimeRE),
+# so every shape below accepts exactly the strings its DATE_PATTERNS entry accepted
+_DAY = r"(?P<day>3[01]|[12]\d|0[1-9]|[1-9]| [1-9])"
+_MONTH = r"(?P<month>1[0-2]|0[1-9]|[1-9])"
+_MON = r"(?P<mon>jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)"
 
-    # Try all direct patterns first
-    for pattern in DATE_PATTERNS:
-        try:
-            dt = datetime.strptime(s, pattern)
-            return dt.date().isoformat()  # YYYY-MM-DD
-        except ValueError:
-            continue
+_MONTH_NUMBERS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+# one compiled shape per entry of DATE_PATTERNS
+_DATE_SHAPES = {
+    "%Y-%m-%d": re.compile(rf"(?P<year>\d\d\d\d)-{_MONTH}-{_DAY}"),
+    "%m/%d/%Y": re.compile(rf"{_MONTH}/{_DAY}/(?P<year>\d\d\d\d)"),
+    "%b %d %Y": re.compile(rf"{_MON}\s+{_DAY}\s+(?P<year>\d\d\d\d)", re.IGNORECASE),
+    "%d-%m-%y": re.compile(rf"{_DAY}-{_MONTH}-(?P<yy>\d\d)"),
+    "%d %b %y": re.compile(rf"{_DAY}\s+{_MON}\s+(?P<yy>\d\d)", re.IGNORECASE),
+    "%d %b %Y": re.compile(rf"{_DAY}\s+{_MON}\s+(?P<year>\d\d\d\d)", re.IGNORECASE),
+}
+
+
+# picks the only DATE_PATTERNS entry (or "suffix") that could match s, based on its shape:
+# - starts with a digit: the separator decides ("/" or "-"), a 4 digit first group means ISO,
+#   otherwise it's day-first with a month name and the length of the trailing year decides
+# - starts with anything else: month name first, a 2 digit year means the suffix format
+# the shapes don't overlap so checking just one of them gives the same answer as trying all of them
+def _date_shape(s: str) -> Optional[str]:
+    if len(s) < 3:
+        return None
+    short_year = s[-3].isspace()
+    if s[0].isdecimal():
+        if "/" in s:
+            return "%m/%d/%Y"
+        if "-" in s:
+            return "%Y-%m-%d" if s.find("-") == 4 else "%d-%m-%y"
+        return "%d %b %y" if short_year else "%d %b %Y"
+    return "suffix" if short_year else "%b %d %Y"
+
+
+# builds the ISO string, None when the numbers aren't a real date (e.g. Feb 30)
+def _iso_date(year: int, month: int, day: int) -> Optional[str]:
+    try:
+        return date(year, month, day).isoformat()
+    except ValueError:
+        return None
+
+
+# the regex match function for one format (a DATE_PATTERNS entry or "suffix"), gives None for other formats
+def _date_matcher(fmt: str) -> Callable[[str], Optional[re.Match]]:
+    if fmt == "suffix":
+        return _suffix_date_regex.match
+    return _DATE_SHAPES[fmt].fullmatch
+
+
+# ISO string from a match of _date_matcher, None when it isn't a real date
+def _date_from_match(fmt: str, m) -> Optional[str]:
+    # use regex to handle mmm dth yy (always 20YY)
+    if fmt == "suffix":
+        month = _MONTH_NUMBERS.get(m.group("mon").lower())
+        if month is None:
+            return None
+        return _iso_date(2000 + int(m.group("year")), month, int(m.group("day")))
+
+    fields = m.groupdict()
+
+    if "yy" in fields:
+        # same pivot as strptime's %y: 00-68 -> 20YY, 69-99 -> 19YY
+        year = int(fields["yy"])
+        year += 2000 if year <= 68 else 1900
+    else:
+        year = int(fields["year"])
+
+    if "mon" in fields:
+        # IGNORECASE lets a few odd unicode letters through that strptime rejects too
+        month = _MONTH_NUMBERS.get(fields["mon"].lower())
+        if month is None:
+            return None
+    else:
+        month = int(fields["month"])
+
+    return _iso_date(year, month, int(fields["day"]))
 
-    # use regex to handle mmm dth yy
 
-    #match handles different starts
-    m = _suffix_date_regex.match(s)
-    if m:
-        #convert to valid datetime format to get ready to convert
-        mon_str = m.group("mon")
-        day = int(m.group("day"))
-        year_short = int(m.group("year"))
+# Adaptive date format order
+# a single feed mostly uses one or two formats. With a per run formats dict (new_date_formats), parse_date
+# counts how often each format hits and, once one format covers at least DATE_ADAPT_MIN_SHARE of the rows,
+# tries that one first and skips the ISO check and the shape check for those rows.
+# No string matches two formats, so the order never changes an answer, only the work per row
 
-        year_full = 2000 + year_short
+# rows to look at before the first format is picked, and the share of rows it needs to keep that spot
+DATE_ADAPT_WARMUP = 100
+DATE_ADAPT_MIN_SHARE = 0.5
 
-        #convert to datetime
+# per run state for parse_date(formats=...), order is a learned order from an earlier run of the same source
+# (date_format_order), its first entry is tried first until this run's own counts say otherwise
+def new_date_formats(order: Optional[List[str]] = None) -> Dict[str, object]:
+    first = order[0] if order else None
+    return {
+        "order": list(order or []),
+        "first": first,
+        "match": _date_matcher(first) if first else None,
+        "hits": {},
+        "rows": 0,
+        "attempts": 0,
+    }
+
+# counts a hit for fmt (found without "first") and moves "first" to the dominant format, or None if no
+# format dominates. Hits on "first" itself only raise its share, so parse_date just counts those
+def _learn_date_format(formats: Dict, fmt: str) -> None:
+    hits = formats["hits"]
+    hits[fmt] = hits.get(fmt, 0) + 1
+    rows = formats["rows"]
+    if rows < DATE_ADAPT_WARMUP:
+        return
+    first = formats["first"]
+    if first is not None and hits.get(first, 0) >= rows * DATE_ADAPT_MIN_SHARE:
+        return
+    first = fmt if hits[fmt] >= rows * DATE_ADAPT_MIN_SHARE else None
+    formats["first"] = first
+    formats["match"] = _date_matcher(first) if first else None
+
+# the counters of a formats dict, summable across workers with _merge_counts
+def _date_format_stats(formats: Dict) -> Dict[str, object]:
+    return {"hits": dict(formats["hits"]), "rows": formats["rows"], "attempts": formats["attempts"]}
+
+# formats from most to least hits, what to persist and pass as order next time
+def date_format_order(stats: Dict) -> List[str]:
+    hits = stats["hits"]
+    return sorted(hits, key=lambda fmt: -hits[fmt])
+
+# the run's counters plus the learned order, what clean_csv returns as "date_formats"
+def _date_format_result(stats: Dict) -> Dict[str, object]:
+    result = dict(stats)
+    result["order"] = date_format_order(stats)
+    return result
+
+
+# a dominant format goes first, the formats never overlap so its match is the answer
+# everything else goes through the usual ISO check and shape dispatch, counted and learned from
+def _parse_date_adaptive(s: str, formats: Dict) -> Optional[str]:
+    formats["rows"] += 1
+    first = formats["first"]
+    if first is not None:
+        formats["attempts"] += 1
+        m = formats["match"](s)
+        if m:
+            hits = formats["hits"]
+            hits[first] = hits.get(first, 0) + 1
+            return _date_from_match(first, m)
+
+    if len(s) == 10 and s[4] == "-" and s[7] == "-" and s.isascii():
+        # counted whether it parses or not, a failed ISO try is still a format tried
+        formats["attempts"] += 1
         try:
-            dt = datetime.strptime(f"{mon_str} {day} {year_full}", "%b %d %Y")
-            return dt.date().isoformat()
+            iso = date.fromisoformat(s).isoformat()
         except ValueError:
-            return None
+            pass
+        else:
+            _learn_date_format(formats, "%Y-%m-%d")
+            return iso
+
+    shape = _date_shape(s)
+    # shape == first was already tried and didn't match
+    if shape is None or shape == first:
+        return None
+    formats["attempts"] += 1
+    m = _date_matcher(shape)(s)
+    if not m:
+        return None
+    _learn_date_format(formats, shape)
+    return _date_from_match(shape, m)
+
+
+# parse dates by finding their format from the shape of the string and going straight to that one parser
+# formats (new_date_formats) turns on the adaptive order, see above
+def parse_date(raw: str, formats: Optional[Dict] = None) -> Optional[str]:
+    s = str(raw).strip()
+    if formats is not None:
+        return _parse_date_adaptive(s, formats)
 
-    return None
+    # fast path for already clean ISO dates (YYYY-MM-DD)
+    if len(s) == 10 and s[4] == "-" and s[7] == "-" and s.isascii():
+        try:
+            return date.fromisoformat(s).isoformat()
+        except ValueError:
+            pass
+
+    shape = _date_shape(s)
+    if shape is None:
+        return None
+    m = _suffix_date_regex.match(s) if shape == "suffix" else _DATE_SHAPES[shape].fullmatch(s)
+    if not m:
+        return None
+    return _date_from_match(shape, m)
 
 
 
@@ -132,42 +277,94 @@ def _canonical_string(s: str) -> str:
     return re.sub(r"[^A-Z0-9]", "", s.upper())
 
 
-# related to these should collpase to one of these 16
-BRAND_KEYS = {
-    "UBER",
-    "STARBUCKS",
-    "AMAZON",
-    "WALMART",
-    "TARGET",
-    "MCDONALDS",
-    "SHELL",
-    "LYFT",
-    "SPOTIFY",
-    "NETFLIX",
-    "APPLE",
-    "GOOGLE",
-    "DOORDASH",
-    "INSTACART",
-    "AIRBNB",
-    "COSTCO",
-}
+# bump when the canonical bases or any of the indexes below are built differently,
+# so the compiled catalog artifact rebuilds them instead of reusing stale ones
+MATCHER_VERSION = 1
 
-# Build (canonical_base, canonical_output) pairs:
-# - If family in BRAND_KEYS -> output key
+# Build (canonical_base, canonical_output) pairs from the shared catalog (merchant_catalog.json):
+# - If family is a brand -> output key
 # - IF restaurants/retail/service -> output original name
 # CANONICAL_BASES = list of {OUTPUT AFTER CLEANING: KEY NAME}
-CANONICAL_BASES = []
-for family, names in BASE_MERCHANTS.items():
-    if family in BRAND_KEYS:
-        canonical_output = family          
-    else:
-        canonical_output = names[0]      
-
-    for base in names:
-        canon = _canonical_string(base)
-        if not canon:
-            continue
-        CANONICAL_BASES.append((canon, canonical_output.upper()))
+def _build_canonical_bases(catalog: Dict) -> List[Tuple[str, str]]:
+    brand_keys = set(catalog["brand_keys"])
+    bases = []
+    for family, names in catalog["base_merchants"].items():
+        if family in brand_keys:
+            canonical_output = family
+        else:
+            canonical_output = names[0]
+
+        for base in names:
+            canon = _canonical_string(base)
+            if not canon:
+                continue
+            bases.append((canon, canonical_output.upper()))
+    return bases
+
+
+# Aho-Corasick automaton over every canonical base, so the exact pass scans the input once
+# instead of running "canon_base in canon_input" for every catalog entry
+# - goto: trie transitions for each state
+# - fail: state to fall back to when a character has no transition (longest proper suffix in the trie)
+# - best: (length, -index) of the best base ending at each state, including ones reached through fail links
+#         bigger length wins and on a tie the earlier catalog entry wins, same as the old best_len loop
+def _build_automaton(bases: List[Tuple[str, str]]) -> Dict[str, list]:
+    goto: List[Dict[str, int]] = [{}]
+    best: List[Optional[Tuple[int, int]]] = [None]
+
+    # trie of all bases
+    for index, (canon_base, _) in enumerate(bases):
+        state = 0
+        for ch in canon_base:
+            nxt = goto[state].get(ch)
+            if nxt is None:
+                nxt = len(goto)
+                goto[state][ch] = nxt
+                goto.append({})
+                best.append(None)
+            state = nxt
+        key = (len(canon_base), -index)
+        if best[state] is None or key > best[state]:
+            best[state] = key
+
+    # fail links breadth first, so a state's fail target is always finished before the state itself
+    fail = [0] * len(goto)
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for ch, nxt in goto[state].items():
+            f = fail[state]
+            while f and ch not in goto[f]:
+                f = fail[f]
+            fail[nxt] = goto[f].get(ch, 0)
+            inherited = best[fail[nxt]]
+            if inherited is not None and (best[nxt] is None or inherited > best[nxt]):
+                best[nxt] = inherited
+            queue.append(nxt)
+
+    return {"goto": goto, "fail": fail, "best": best}
+
+
+# single scan of the canonical input, returns the output of the longest base it contains (None if none)
+def _longest_base_match(canon_input: str) -> Optional[str]:
+    matchers = _matchers()
+    goto = matchers["automaton"]["goto"]
+    fail = matchers["automaton"]["fail"]
+    best = matchers["automaton"]["best"]
+
+    state = 0
+    found = None
+    for ch in canon_input:
+        while state and ch not in goto[state]:
+            state = fail[state]
+        state = goto[state].get(ch, 0)
+        hit = best[state]
+        if hit is not None and (found is None or hit > found):
+            found = hit
+
+    if found is None:
+        return None
+    return matchers["bases"][-found[1]][1]
 
 # Matches based on spelling errors using edit distance algorithm
 def levenshtein(a: str, b: str) -> int:
@@ -193,10 +390,335 @@ def levenshtein(a: str, b: str) -> int:
     return prev[-1]
 
 
-def clean_merchant(raw: str) -> str:
+# same edit distance but with a budget: only distances up to max_dist are computed exactly,
+# anything bigger comes back as max_dist + 1 as soon as that's certain
+# - strings whose lengths differ by more than max_dist can't be within budget, skip them right away
+# - a cell (i, j) is at least |i - j| so only the diagonal band of width max_dist is filled in
+# - once every cell in a row is over budget the final answer will be too, so stop there
+def bounded_levenshtein(a: str, b: str, max_dist: int) -> int:
+    over = max_dist + 1
+    if abs(len(a) - len(b)) > max_dist:
+        return over
+    if a == b:
+        return 0
+    if not a:
+        return len(b)
+    if not b:
+        return len(a)
+
+    # cells outside the band stay at "over"
+    prev = [j if j <= max_dist else over for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, start=1):
+        cur = [over] * (len(b) + 1)
+        if i <= max_dist:
+            cur[0] = i
+        row_min = cur[0]
+        for j in range(max(1, i - max_dist), min(len(b), i + max_dist) + 1):
+            ins = cur[j - 1] + 1
+            delete = prev[j] + 1
+            sub = prev[j - 1] + (ca != b[j - 1])
+            dist = min(ins, delete, sub, over)
+            cur[j] = dist
+            if dist < row_min:
+                row_min = dist
+        # every path to the end goes through this row
+        if row_min > max_dist:
+            return over
+        prev = cur
+    return prev[-1]
+
+
+# Myers' bit-parallel edit distance (Hyyro's version for whole-string distance)
+# one bit per character of the pattern, so a whole column of the table is updated with a few integer
+# operations per character of the text instead of an inner python loop
+# longer patterns than this go back to bounded_levenshtein to keep the bit vectors machine word sized
+MYERS_MAX_LEN = 64
+
+# bit mask of the positions of every character in the pattern
+def _myers_peq(pattern: str) -> Dict[str, int]:
+    peq: Dict[str, int] = {}
+    for i, ch in enumerate(pattern):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+    return peq
+
+# distance between the pattern (given by its peq masks and length) and text
+def _myers_distance(peq: Dict[str, int], m: int, text: str) -> int:
+    if m == 0:
+        return len(text)
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv = full   # vertical +1 deltas
+    mv = 0      # vertical -1 deltas
+    score = m
+    for ch in text:
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        # the top row of the table goes up by one per text character
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+    return score
+
+def myers_levenshtein(a: str, b: str) -> int:
+    if len(a) > MYERS_MAX_LEN:
+        return levenshtein(a, b)
+    return _myers_distance(_myers_peq(a), len(a), b)
+
+
+# Distance backends for the fuzzy pass
+# each one takes the canonical input once and returns a scorer(canon_base, max_dist), which
+# gives the exact distance when it is at most max_dist and something bigger otherwise
+# - "levenshtein": bounded_levenshtein, banded with early exit
+# - "myers": bit-parallel, pattern masks built once per input, longer inputs than MYERS_MAX_LEN use "levenshtein"
+def _levenshtein_scorer(canon_input: str) -> Callable[[str, int], int]:
+    return lambda canon_base, max_dist: bounded_levenshtein(canon_input, canon_base, max_dist)
+
+def _myers_scorer(canon_input: str) -> Callable[[str, int], int]:
+    if len(canon_input) > MYERS_MAX_LEN:
+        return _levenshtein_scorer(canon_input)
+    peq = _myers_peq(canon_input)
+    m = len(canon_input)
+
+    def score(canon_base: str, max_dist: int) -> int:
+        # same length shortcut as bounded_levenshtein
+        if abs(m - len(canon_base)) > max_dist:
+            return max_dist + 1
+        return _myers_distance(peq, m, canon_base)
+
+    return score
+
+DISTANCE_BACKENDS = {
+    "levenshtein": _levenshtein_scorer,
+    "myers": _myers_scorer,
+}
+
+# which entry of DISTANCE_BACKENDS clean_merchant uses
+DISTANCE_BACKEND = "myers"
+
+
+# BK-tree over the canonical bases for the fuzzy pass
+# every node is [canon_base, catalog index, {distance: child}], a child sits under the edge with its
+# distance to the parent. Edit distance is a metric, so for a query q at distance d from a node, a base
+# under edge k is at least |k - d| away from q, and whole subtrees can be skipped once that's worse than
+# the best match so far. Repeated canonical bases keep only their first catalog index, later copies
+# could never win a tie anyway
+def _build_bktree(bases: List[Tuple[str, str]]) -> Optional[list]:
+    root = None
+    for index, (canon_base, _) in enumerate(bases):
+        if root is None:
+            root = [canon_base, index, {}]
+            continue
+        node = root
+        while True:
+            dist = myers_levenshtein(canon_base, node[0])
+            if dist == 0:
+                break
+            child = node[2].get(dist)
+            if child is None:
+                node[2][dist] = [canon_base, index, {}]
+                break
+            node = child
+    return root
+
+
+# nearest base to the canonical input, ties go to the earliest catalog entry like the full scan
+# returns the canonical output, None for an empty catalog
+def _nearest_base_bktree(canon_input: str) -> Optional[str]:
+    matchers = _matchers()
+    if matchers["bktree"] is None:
+        return None
+    distance = DISTANCE_BACKENDS[DISTANCE_BACKEND](canon_input)
+    best_dist = 10**9
+    best_index = -1
+    # best first: always expand the node with the smallest lower bound, so best_dist shrinks early
+    # the counter keeps heap entries comparable without looking at the nodes
+    heap = [(0, 0, matchers["bktree"])]
+    pushed = 1
+    while heap:
+        lower_bound, _, (canon_base, index, children) = heapq.heappop(heap)
+        # keep nodes that could still tie, an earlier catalog entry may be hiding there
+        if lower_bound > best_dist:
+            break
+        # exact distance is needed here since it decides which edges can be skipped
+        dist = distance(canon_base, 10**9)
+        if dist < best_dist or (dist == best_dist and index < best_index):
+            best_dist = dist
+            best_index = index
+        for edge, child in children.items():
+            # everything under this edge is at least |edge - dist| away from the input
+            child_bound = max(lower_bound, abs(edge - dist))
+            if child_bound <= best_dist:
+                heapq.heappush(heap, (child_bound, pushed, child))
+                pushed += 1
+    return matchers["bases"][best_index][1]
+
+
+# brute force version: score every base and keep the first one with the smallest distance
+def _nearest_base_scan(canon_input: str) -> Optional[str]:
+    distance = DISTANCE_BACKENDS[DISTANCE_BACKEND](canon_input)
+    best_dist = 10**9
+    best = None
+    for canon_base, canonical_output in _matchers()["bases"]:
+        # gets number of matching, take canonical_output of smallest dist as small dist means least edits (likely 1 or 2 due to spelling errors)
+        # only a distance below best_dist can win, so the budget lets most candidates bail out early
+        dist = distance(canon_base, best_dist - 1)
+        if dist < best_dist:
+            best_dist = dist
+            best = canonical_output
+    return best
+
+
+# Character trigram index to prefilter fuzzy candidates
+# a typo only breaks the few trigrams around it, so the right base still shares most of its trigrams
+# with the input and ends up near the top when candidates are ranked by shared trigrams.
+# Trigrams that many bases have (like the ones in "SERVICES") say little, so each shared trigram is
+# weighted by how rare it is in the catalog (idf)
+NGRAM_SIZE = 3
+
+# how many of the best ranked candidates get an exact distance
+NGRAM_CANDIDATES = 20
+
+# trigrams of a canonical string, "#" marks the ends so short strings and their first/last letters count too
+def _ngrams(canon: str) -> set:
+    padded = f"#{canon}#"
+    return {padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+# trigram -> (idf weight, catalog indexes of the bases containing it), only the first copy of each canonical base
+def _build_ngram_index(bases: List[Tuple[str, str]]) -> Dict[str, Tuple[float, List[int]]]:
+    postings: Dict[str, List[int]] = {}
+    seen = set()
+    for i, (canon_base, _) in enumerate(bases):
+        if canon_base in seen:
+            continue
+        seen.add(canon_base)
+        for gram in _ngrams(canon_base):
+            postings.setdefault(gram, []).append(i)
+
+    return {
+        gram: (math.log(len(seen) / len(ids)) + 1.0, ids)
+        for gram, ids in postings.items()
+    }
+
+
+# everything the matcher needs, built once per catalog version and kept in the compiled artifact
+def _compile_matchers(catalog: Dict) -> Dict:
+    bases = _build_canonical_bases(catalog)
+    return {
+        "bases": bases,
+        "automaton": _build_automaton(bases),
+        "bktree": _build_bktree(bases),
+        "ngrams": _build_ngram_index(bases),
+    }
+
+
+# loaded on first use, so importing this module doesn't touch the catalog
+_MATCHERS: Optional[Dict] = None
+
+def _matchers() -> Dict:
+    global _MATCHERS
+    if _MATCHERS is None:
+        catalog = merchantcatalog.load_compiled({"matchers": (MATCHER_VERSION, _compile_matchers)})
+        _MATCHERS = catalog["indexes"]["matchers"]["data"]
+    return _MATCHERS
+
+# (canonical_base, canonical_output) pairs in catalog order
+def canonical_bases() -> List[Tuple[str, str]]:
+    return _matchers()["bases"]
+
+# CANONICAL_BASES, BASE_MERCHANTS and BRAND_KEYS still work as module attributes, read from the catalog
+def __getattr__(name: str):
+    if name == "CANONICAL_BASES":
+        return canonical_bases()
+    if name == "BASE_MERCHANTS":
+        return merchantcatalog.load_compiled()["base_merchants"]
+    if name == "BRAND_KEYS":
+        return set(merchantcatalog.load_compiled()["brand_keys"])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# closest base among the top candidates by shared trigram weight (closer length, then earlier entry on ties)
+# approximate: the true closest base can be missed if it shares few trigrams (see ngram_recall)
+# falls back to the BK-tree when the input shares no trigram with anything
+def _nearest_base_ngram(canon_input: str, candidates: Optional[int] = None) -> Optional[str]:
+    if candidates is None:
+        candidates = NGRAM_CANDIDATES
+
+    matchers = _matchers()
+    bases = matchers["bases"]
+    scores: Dict[int, float] = {}
+    for gram in _ngrams(canon_input):
+        entry = matchers["ngrams"].get(gram)
+        if entry is None:
+            continue
+        weight, ids = entry
+        for i in ids:
+            scores[i] = scores.get(i, 0.0) + weight
+    if not scores:
+        return _nearest_base_bktree(canon_input)
+
+    n = len(canon_input)
+    top = heapq.nsmallest(
+        candidates,
+        scores,
+        key=lambda i: (-scores[i], abs(len(bases[i][0]) - n), i),
+    )
+
+    distance = DISTANCE_BACKENDS[DISTANCE_BACKEND](canon_input)
+    best_dist = 10**9
+    best_index = -1
+    for i in top:
+        dist = distance(bases[i][0], best_dist)
+        if dist < best_dist or (dist == best_dist and i < best_index):
+            best_dist = dist
+            best_index = i
+    return bases[best_index][1]
+
+
+# recall check for the trigram prefilter: share of fuzzy-pass inputs where it picks the same output as the
+# full scan. samples are raw merchant strings, generated ones from datacreation.random_merchant if not given
+def ngram_recall(samples: Optional[List[str]] = None, candidates: Optional[int] = None) -> Dict[str, object]:
+    if samples is None:
+        import datacreation
+        samples = [datacreation.random_merchant() for _ in range(10000)]
+
+    checked = 0
+    matched = 0
+    for raw in samples:
+        canon_input = _canonical_string(str(raw).strip())
+        # only inputs that actually reach the fuzzy pass
+        if not canon_input or _longest_base_match(canon_input) is not None:
+            continue
+        checked += 1
+        if _nearest_base_ngram(canon_input, candidates) == _nearest_base_scan(canon_input):
+            matched += 1
+
+    return {
+        "checked": checked,
+        "matched": matched,
+        "recall": matched / checked if checked else 1.0,
+    }
+
+
+# how the fuzzy pass finds the closest base
+# - "bktree": query the BK-tree, skips most of a large catalog, same answer as "scan"
+# - "scan": compare against every base
+# - "ngram": exact distance only for the NGRAM_CANDIDATES bases sharing the most trigrams, approximate
+FUZZY_INDEX = "bktree"
+
+
+def clean_merchant(raw: str, aliases: Optional[Dict[str, Dict]] = None) -> str:
     """
     Returns cleaned merchant name.
     If it cannot be mapped, returns the string "ERROR".
+    With a learned alias table (see load_aliases) it's checked first and new matches are added to it.
     """
    
     s = str(raw).strip()
@@ -207,43 +729,195 @@ def clean_merchant(raw: str) -> str:
     #uses cleaner regex function from earlier
     canon_input = _canonical_string(s)
 
+    if aliases is None:
+        return _match_canonical_merchant(canon_input)
+
+    # exact hash lookup before any scan
+    entry = aliases.get(canon_input)
+    if entry is not None:
+        entry["run_hits"] += 1
+        return entry["output"]
+
+    output, found_by = _resolve_merchant(canon_input)
+    # the ngram pass is approximate, an alias is served as an exact answer to every later run
+    if output != "ERROR" and found_by != "ngram":
+        aliases[canon_input] = {"output": output, "pass": found_by, "run_hits": 1, "new": True}
+    return output
+
+
+# batch version of clean_merchant for a whole column of raw merchants
+# raw merchant strings repeat a lot, so each distinct raw value is canonicalized once and each distinct
+# canonical string goes through the substring/levenshtein passes once, then results are mapped back to every row
+# returns the cleaned merchant per row plus how many distinct values were actually resolved
+def clean_merchants(raws: Iterable[str]) -> Dict[str, object]:
+    raws = list(raws)
+
+    canon_by_raw: Dict[str, str] = {}
+    for raw in raws:
+        if raw not in canon_by_raw:
+            canon_by_raw[raw] = _canonical_string(str(raw).strip())
+
+    output_by_canon: Dict[str, str] = {}
+    for canon in canon_by_raw.values():
+        if canon not in output_by_canon:
+            output_by_canon[canon] = _match_canonical_merchant(canon)
+
+    return {
+        "merchants": [output_by_canon[canon_by_raw[raw]] for raw in raws],
+        "total": len(raws),
+        "distinct": len(canon_by_raw),
+        "distinct_canonical": len(output_by_canon),
+    }
+
+
+# both matching passes for an already canonical input, shared by clean_merchant and the column based cleaners
+def _match_canonical_merchant(canon_input: str) -> str:
+    return _resolve_merchant(canon_input)[0]
+
+
+# cleaned merchant plus the pass that found it: "substring", the FUZZY_INDEX used for the fuzzy pass,
+# or "none" when nothing matched
+def _resolve_merchant(canon_input: str) -> Tuple[str, str]:
     if not canon_input:
-        return "ERROR"
+        return "ERROR", "none"
 
     # first filter check for matches that have no spelling errors by handling extra characters and finding best match
-    best_match = None
-    best_len = 0
-    for canon_base, canonical_output in CANONICAL_BASES:
-        #checks if input contains one of the bases, only makes best match if has more matching characters than pervious best match
-        if canon_base in canon_input and len(canon_base) > best_len:
-            best_len = len(canon_base)
-            best_match = canonical_output
-    
+    # the automaton finds the longest base contained in the input (earliest catalog entry on ties) in one pass
+    best_match = _longest_base_match(canon_input)
+
     # returns if found valid match
     if best_match is not None:
-        return best_match
+        return best_match, "substring"
 
     # second fiter accounts for spelling errors using previous levenshtein filter using the same length matching as filter 1
     # matches when theres a very small difference due to spellingthere's
-    best_dist = 10**9
-    best = None
-    for canon_base, canonical_output in CANONICAL_BASES:
-        # gets number of matching, take canonical_output of smallest dist as small dist means least edits (likely 1 or 2 due to spelling errors)
-        dist = levenshtein(canon_input, canon_base)
-        if dist < best_dist:
-            best_dist = dist
-            best = canonical_output
+    if FUZZY_INDEX == "bktree":
+        best = _nearest_base_bktree(canon_input)
+    elif FUZZY_INDEX == "ngram":
+        best = _nearest_base_ngram(canon_input)
+    else:
+        best = _nearest_base_scan(canon_input)
 
     # should return at this point if not at the first filter
     if best is not None:
-        return best
+        return best, FUZZY_INDEX
 
     # Final fallback — nothing matched
-    return "ERROR"
+    return "ERROR", "none"
 
 
 
     
+# Learned merchant aliases
+# -------------------------------------
+# every canonical input the exact passes above resolve is remembered in a small sqlite table, so the next
+# file gets it back with one exact lookup instead of paying for the Aho-Corasick/levenshtein work again.
+# Matches of FUZZY_INDEX = "ngram" aren't, it can miss the closest base and an alias is served as exact.
+# In memory it's a dict canon -> {"output", "pass", "run_hits", "new"}, only entries touched during
+# the run are written back
+
+ALIAS_DB = "../datasets/merchant_aliases.sqlite"
+
+# size limit and aging: entries unused for ALIAS_MAX_AGE_DAYS are dropped, then the least recently
+# used ones (fewest hits on ties) until at most ALIAS_MAX_ENTRIES are left
+ALIAS_MAX_ENTRIES = 100000
+ALIAS_MAX_AGE_DAYS = 180
+
+# fingerprint of the catalog and the matchers, learned aliases from a different catalog or matcher code
+# are thrown away
+def _catalog_signature() -> str:
+    return hashlib.sha256(repr((MATCHER_VERSION, canonical_bases())).encode("utf-8")).hexdigest()
+
+def _open_alias_db(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS aliases ("
+        " canon TEXT PRIMARY KEY,"
+        " output TEXT NOT NULL,"
+        " pass TEXT NOT NULL,"
+        " hits INTEGER NOT NULL DEFAULT 0,"
+        " created REAL NOT NULL,"
+        " last_used REAL NOT NULL)"
+    )
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    row = conn.execute("SELECT value FROM meta WHERE key = 'catalog'").fetchone()
+    signature = _catalog_signature()
+    if row is None or row[0] != signature:
+        with conn:
+            conn.execute("DELETE FROM aliases")
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('catalog', ?)", (signature,))
+    return conn
+
+# reads the learned alias table into the dict clean_merchant uses
+def load_aliases(path: str = ALIAS_DB) -> Dict[str, Dict]:
+    conn = _open_alias_db(path)
+    try:
+        return {
+            canon: {"output": output, "pass": found_by, "run_hits": 0, "new": False}
+            for canon, output, found_by in conn.execute("SELECT canon, output, pass FROM aliases")
+        }
+    finally:
+        conn.close()
+
+# writes back every alias used or learned this run, then applies the age and size limits
+def save_aliases(
+    aliases: Dict[str, Dict],
+    path: str = ALIAS_DB,
+    max_entries: int = ALIAS_MAX_ENTRIES,
+    max_age_days: float = ALIAS_MAX_AGE_DAYS,
+) -> int:
+    now = time.time()
+    touched = [
+        (canon, entry["output"], entry["pass"], entry["run_hits"], now, now)
+        for canon, entry in aliases.items()
+        if entry["run_hits"] or entry["new"]
+    ]
+
+    conn = _open_alias_db(path)
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT INTO aliases (canon, output, pass, hits, created, last_used) VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(canon) DO UPDATE SET hits = hits + excluded.hits, last_used = excluded.last_used",
+                touched,
+            )
+            conn.execute("DELETE FROM aliases WHERE last_used < ?", (now - max_age_days * 86400,))
+            conn.execute(
+                "DELETE FROM aliases WHERE canon NOT IN"
+                " (SELECT canon FROM aliases ORDER BY last_used DESC, hits DESC LIMIT ?)",
+                (max_entries,),
+            )
+        return conn.execute("SELECT COUNT(*) FROM aliases").fetchone()[0]
+    finally:
+        conn.close()
+
+# hits on already known aliases and newly learned ones for this run
+def _alias_stats(aliases: Dict[str, Dict]) -> Dict[str, int]:
+    hits = 0
+    learned = 0
+    for entry in aliases.values():
+        if entry["new"]:
+            learned += 1
+        else:
+            hits += entry["run_hits"]
+    return {"hits": hits, "learned": learned}
+
+# entries a worker process touched, to be merged into the parent's table
+def _touched_aliases(aliases: Dict[str, Dict]) -> Dict[str, Dict]:
+    return {canon: entry for canon, entry in aliases.items() if entry["run_hits"] or entry["new"]}
+
+def _merge_aliases(aliases: Dict[str, Dict], touched: Dict[str, Dict]) -> None:
+    for canon, entry in touched.items():
+        known = aliases.get(canon)
+        if known is None:
+            aliases[canon] = dict(entry)
+        else:
+            known["run_hits"] += entry["run_hits"]
+            # two workers can both learn the same alias
+            known["new"] = known["new"] or entry["new"]
+
+
 # Amount normalization, one functions
 # ---------------------
 
@@ -263,86 +937,1278 @@ def parse_amount(raw: str) -> Optional[str]:
     return f"{float(s):.2f}" if s else None
 
 
-# Main cleaning , bringing it all together
+# Amounts as integer cents
 # --------------------------
+# same answers as parse_amount, but as an int number of cents, no regex and no float for the usual shapes
+# ([+-]digits with at most 2 decimals, commas/$/USD anywhere). Only formatted back to text when written
+# Anything else (more decimals, exponents, underscores, non ascii text) goes through parse_amount's float
+# rounding so the output stays the same. Differences: "-0.00" comes out as "0.00", amounts past float
+# precision (about 90 trillion) stay exact, and inf/nan count as amount errors instead of being written
+
+# 10 ** (2 - number of decimals)
+_CENT_SCALE = (100, 10, 1)
+
+# exact cents for [+-]digits[.dd], None if s isn't that shape
+def _scan_cents(s: str) -> Optional[int]:
+    body = s[1:] if s[0] in "+-" else s
+    dot = body.find(".")
+    if dot < 0:
+        if not body.isdigit():
+            return None
+        cents = int(body) * 100
+    else:
+        decimals = len(body) - dot - 1
+        if decimals > 2:
+            return None
+        digits = body[:dot] + body[dot + 1:]
+        if not digits.isdigit():
+            return None
+        cents = int(digits) * _CENT_SCALE[decimals]
+    return -cents if s[0] == "-" else cents
 
-def clean_csv() -> Dict[str, object]:
-    #keepign track of rows and errors
-    cleaned_rows: List[Dict[str, str]] = []
-    date_errors = 0
-    amount_errors = 0
-    merchant_unmapped = 0
-    total_rows = 0
+# cents of a parse_amount result ("-12.34", "inf"), None for non finite amounts
+def _cents_from_text(text: Optional[str]) -> Optional[int]:
+    if text is None:
+        return None
+    return _scan_cents(text)
 
-    # create and fill new csv with clean values
-    with open(INPUT_FILE, mode="r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            total_rows += 1
-
-            # grabbing messy values
-            raw_date = row.get("date", "")
-            raw_merchant = row.get("merchant", "")
-            raw_amount = row.get("amount", "")
-            
-            # cleaning values
-            clean_date = parse_date(raw_date)
-            clean_amount = parse_amount(raw_amount)
-            clean_merchant_val = clean_merchant(raw_merchant)
-
-            # error catching
-            if clean_date is None:
-                date_errors += 1
-                continue
+def parse_amount_cents(raw: str) -> Optional[int]:
+    s = str(raw).strip()
+    # re's case insensitive "usd" also matches some non ascii letters, leave those to parse_amount
+    if not s.isascii():
+        return _cents_from_text(parse_amount(raw))
+
+    # drop "usd" in any case, left to right like re.sub
+    lower = s.lower()
+    j = lower.find("usd")
+    if j >= 0:
+        parts = []
+        i = 0
+        while j >= 0:
+            parts.append(s[i:j])
+            i = j + 3
+            j = lower.find("usd", i)
+        parts.append(s[i:])
+        s = "".join(parts)
+
+    s = s.replace("$", "").replace(",", "").strip()
+    if not s:
+        return None
 
-            if clean_amount is None:
-                amount_errors += 1
-                continue
+    cents = _scan_cents(s)
+    if cents is None:
+        # rare shapes float() still accepts, rounded exactly like parse_amount
+        cents = _cents_from_text(f"{float(s):.2f}")
+    return cents
+
+# cents -> "1234.50" / "-0.99", what parse_amount would have returned
+def format_cents(cents: int) -> str:
+    if cents < 0:
+        return "-%d.%02d" % divmod(-cents, 100)
+    return "%d.%02d" % divmod(cents, 100)
+
+
+# Caching for repeated raw values
+# --------------------------
+
+# how many distinct raw values each field cleaner remembers during one clean_csv run (0 turns caching off)
+# statement feeds repeat the same date/merchant/amount strings a lot, so hits skip the regex/levenshtein work
+CACHE_SIZE = 4096
+
+# wraps parse_date, parse_amount and clean_merchant in their own bounded LRU caches
+# (clean_merchant bound to the learned alias table when there is one)
+# integer_cents swaps in parse_amount_cents, and "amount_format" turns the cents back into text for writing
+# date_formats (new_date_formats) binds parse_date to the adaptive format order, only cache misses are counted
+def _cached_cleaners(
+    cache_size: int,
+    aliases: Optional[Dict[str, Dict]] = None,
+    integer_cents: bool = False,
+    date_formats: Optional[Dict] = None,
+) -> Dict[str, Callable]:
+    merchant_cleaner = clean_merchant
+    if aliases is not None:
+        merchant_cleaner = functools.partial(clean_merchant, aliases=aliases)
+    date_parser = parse_date
+    if date_formats is not None:
+        date_parser = functools.partial(parse_date, formats=date_formats)
+    cleaners = {
+        "date": functools.lru_cache(maxsize=cache_size)(date_parser),
+        "amount": functools.lru_cache(maxsize=cache_size)(parse_amount_cents if integer_cents else parse_amount),
+        "merchant": functools.lru_cache(maxsize=cache_size)(merchant_cleaner),
+    }
+    if integer_cents:
+        cleaners["amount_format"] = format_cents
+    return cleaners
+
+# hit/miss counters for each cached cleaner
+def _cache_stats(cleaners: Dict[str, Callable]) -> Dict[str, Dict[str, int]]:
+    stats = {}
+    for field, cleaner in cleaners.items():
+        if not hasattr(cleaner, "cache_info"):
+            continue
+        info = cleaner.cache_info()
+        stats[field] = {"hits": info.hits, "misses": info.misses}
+    return stats
 
-            if clean_merchant_val == "ERROR":
-                merchant_unmapped += 1
 
-            # adding clean data to dataset
-            cleaned_rows.append(
-                {
-                    "date": clean_date,
-                    "merchant": clean_merchant_val,
-                    "amount": clean_amount,
-                }
+# Vectorized cleaning of a whole DataFrame
+# --------------------------
+# same results as the row by row path, but each step runs as pandas column operations:
+# - amounts: vectorized str strip/replace for USD, $ and commas, then one float conversion for the column
+# - merchants: vectorized _canonical_string, then each unique canonical string is resolved once and mapped back
+# - dates: rows are grouped by _date_shape and every group is parsed with one str.extract of its pattern
+# pandas is only needed here, so it's imported inside the functions
+
+# python int() of every distinct value of a column of digit strings (NaN stays NaN)
+def _column_ints(col):
+    lookup = {value: int(value) for value in col.dropna().unique()}
+    return col.map(lookup)
+
+# the _date_shape of every string in a column ("" when there isn't one)
+def _date_shape_column(s):
+    import numpy as np
+    import pandas as pd
+
+    first_digit = s.str[:1].str.isdecimal()
+    short_year = s.str[-3:-2].str.isspace()
+    has_slash = s.str.contains("/", regex=False)
+    has_dash = s.str.contains("-", regex=False)
+    iso = s.str.find("-") == 4
+
+    conditions = [
+        s.str.len() < 3,
+        first_digit & has_slash,
+        first_digit & has_dash & iso,
+        first_digit & has_dash,
+        first_digit & short_year,
+        first_digit,
+        short_year,
+    ]
+    choices = ["", "%m/%d/%Y", "%Y-%m-%d", "%d-%m-%y", "%d %b %y", "%d %b %Y", "suffix"]
+    return pd.Series(np.select(conditions, choices, default="%b %d %Y"), index=s.index, dtype=object)
+
+# parse_date for a whole column of stripped strings, returns ISO strings or None
+def _parse_date_column(s):
+    import pandas as pd
+
+    out = pd.Series(None, index=s.index, dtype=object)
+    shapes = _date_shape_column(s)
+
+    for shape in shapes.unique():
+        if not shape:
+            continue
+        part = s[shapes == shape]
+
+        if shape == "suffix":
+            fields = part.str.extract(_suffix_date_regex.pattern)
+            year = 2000 + _column_ints(fields["year"])
+        else:
+            regex = _DATE_SHAPES[shape]
+            fields = part.str.extract(rf"^(?:{regex.pattern})\Z", flags=regex.flags & re.IGNORECASE)
+            if "yy" in fields:
+                # same pivot as strptime's %y: 00-68 -> 20YY, 69-99 -> 19YY
+                yy = _column_ints(fields["yy"])
+                year = yy + 1900 + 100 * (yy <= 68)
+            else:
+                year = _column_ints(fields["year"])
+
+        if "mon" in fields:
+            month = fields["mon"].str.lower().map(_MONTH_NUMBERS)
+        else:
+            month = _column_ints(fields["month"])
+        day = _column_ints(fields["day"])
+
+        matched = year.notna() & month.notna() & day.notna()
+        # pandas timestamps only cover 1677-2262, anything outside goes through parse_date itself
+        in_range = matched & (year > 1677) & (year < 2262)
+        if in_range.any():
+            stamps = pd.to_datetime(
+                pd.DataFrame({"year": year[in_range], "month": month[in_range], "day": day[in_range]}).astype("int64"),
+                errors="coerce",
             )
+            iso = stamps.dt.strftime("%Y-%m-%d")
+            out[iso.index] = iso.where(stamps.notna(), None)
+        outside = matched & ~in_range
+        if outside.any():
+            out[part.index[outside]] = part[outside].map(parse_date)
+
+    return out
+
+# parse_amount for a whole column of raw strings, returns "1234.50" style strings or None
+def _parse_amount_column(raw):
+    import pandas as pd
+
+    s = (
+        raw.str.strip()
+        .str.replace(r"(?i)usd", "", regex=True)
+        .str.replace("$", "", regex=False)
+        .str.replace(",", "", regex=False)
+        .str.strip()
+    )
+    out = pd.Series(None, index=s.index, dtype=object)
+    present = s != ""
+    # like parse_amount, text that isn't a number raises ValueError
+    values = s[present].astype("float64")
+    out[values.index] = values.map("{:.2f}".format)
+    return out
+
+# clean_merchant for a whole column, each distinct canonical string is matched only once
+def _clean_merchant_column(raw):
+    canon = raw.str.strip().str.upper().str.replace(r"[^A-Z0-9]", "", regex=True)
+    lookup = {c: _match_canonical_merchant(c) for c in canon.unique()}
+    return canon.map(lookup)
+
+# raw column as plain strings, empty cells (NaN) become "" like csv.DictReader gives them
+def _raw_column(df, name: str):
+    import pandas as pd
+
+    if name not in df:
+        return pd.Series("", index=df.index, dtype=object)
+    return df[name].fillna("").astype(str).astype(object)
+
+
+# cleans a DataFrame of raw date/merchant/amount strings with column operations
+# read the raw csv with dtype=str and keep_default_na=False to get exactly the strings csv.DictReader sees
+# returns the same counters as clean_csv plus "cleaned_df", the kept rows (same values as the cleaned csv)
+def clean_dataframe(df) -> Dict[str, object]:
+    import pandas as pd
+
+    raw_date = _raw_column(df, "date")
+    raw_merchant = _raw_column(df, "merchant")
+    raw_amount = _raw_column(df, "amount")
+
+    clean_date = _parse_date_column(raw_date.str.strip())
+    clean_amount = _parse_amount_column(raw_amount)
+    clean_merchant_val = _clean_merchant_column(raw_merchant)
+
+    # error catching, a row missing its date only counts as a date error
+    date_ok = clean_date.notna()
+    amount_ok = clean_amount.notna()
+    keep = date_ok & amount_ok
+
+    cleaned_df = pd.DataFrame(
+        {
+            "date": clean_date[keep],
+            "merchant": clean_merchant_val[keep],
+            "amount": clean_amount[keep],
+        }
+    ).reset_index(drop=True)
+
+    stats = _new_stats()
+    stats["total_rows"] = len(df)
+    stats["rows_kept"] = int(keep.sum())
+    stats["date_errors"] = int((~date_ok).sum())
+    stats["amount_errors"] = int((date_ok & ~amount_ok).sum())
+    stats["merchant_unmapped"] = int((cleaned_df["merchant"] == "ERROR").sum())
+
+    result: Dict[str, object] = dict(stats)
+    result["cleaned_df"] = cleaned_df
+    return result
 
-    # Write cleaned CSV
-    with open(OUTPUT_FILE, mode="w", newline="", encoding="utf-8") as f_out:
-        writer = csv.DictWriter(f_out, fieldnames=["date", "merchant", "amount"])
-        writer.writeheader()
-        writer.writerows(cleaned_rows)
 
+# Main cleaning , bringing it all together
+# --------------------------
+
+# output columns of the cleaned csv
+CLEAN_FIELDS = ["date", "merchant", "amount"]
+
+# zeroed error counters for one cleaning run
+def _new_stats() -> Dict[str, int]:
     return {
-        "cleaned_rows": cleaned_rows,
-        "total_rows": total_rows,
-        "date_errors": date_errors,
-        "amount_errors": amount_errors,
-        "merchant_unmapped": merchant_unmapped,
+        "total_rows": 0,
+        "rows_kept": 0,
+        "date_errors": 0,
+        "amount_errors": 0,
+        "merchant_unmapped": 0,
     }
 
+# cleans raw rows one at a time and yields each kept row as soon as it's ready,
+# the error counters in stats are updated as it goes so nothing has to be held in memory
+def iter_clean_rows(
+    raw_rows: Iterable[Dict[str, str]],
+    stats: Dict[str, int],
+    cleaners: Optional[Dict[str, Callable]] = None,
+) -> Iterator[Dict[str, str]]:
+    # grabbing messy values, a short row leaves csv.DictReader's missing fields at None and those count as
+    # empty, the same as _iter_mapped_fields does (so a ragged row is a date or amount error, not a crash)
+    raw_fields = ((row.get("date") or "", row.get("merchant") or "", row.get("amount") or "") for row in raw_rows)
+    return _iter_clean_fields(raw_fields, stats, cleaners)
+
+# same as iter_clean_rows for raw (date, merchant, amount) tuples, what the memory-mapped reader produces
+def _iter_clean_fields(
+    raw_fields: Iterable[Tuple[str, str, str]],
+    stats: Dict[str, int],
+    cleaners: Optional[Dict[str, Callable]] = None,
+) -> Iterator[Dict[str, str]]:
+    if cleaners is None:
+        cleaners = {"date": parse_date, "amount": parse_amount, "merchant": clean_merchant}
+    cached_parse_date = cleaners["date"]
+    cached_parse_amount = cleaners["amount"]
+    cached_clean_merchant = cleaners["merchant"]
+    # set when amounts come back as integer cents
+    format_amount = cleaners.get("amount_format")
+
+    for raw_date, raw_merchant, raw_amount in raw_fields:
+        stats["total_rows"] += 1
+
+        # cleaning values
+        clean_date = cached_parse_date(raw_date)
+        clean_amount = cached_parse_amount(raw_amount)
+        clean_merchant_val = cached_clean_merchant(raw_merchant)
+
+        # error catching
+        if clean_date is None:
+            stats["date_errors"] += 1
+            continue
+
+        if clean_amount is None:
+            stats["amount_errors"] += 1
+            continue
+
+        if clean_merchant_val == "ERROR":
+            stats["merchant_unmapped"] += 1
+
+        stats["rows_kept"] += 1
+        yield {
+            "date": clean_date,
+            "merchant": clean_merchant_val,
+            "amount": clean_amount if format_amount is None else format_amount(clean_amount),
+        }
+
+
+# Memory-mapped input
+# --------------------------
+# with mmap_input the raw file is mapped instead of read through open() + csv.DictReader: records are found
+# straight on the mapped bytes and each line is split on commas, no dict per raw row and no read() copies
+# into a file buffer (lines with quotes still go through the csv module). Only the date, merchant and amount
+# fields are kept, missing ones count as empty (iter_clean_rows treats DictReader's None the same way).
+# Like the byte ranges below, this relies on one record per line
+
+RAW_FIELDS = ("date", "merchant", "amount")
+
+# the whole file as a read only mmap (b"" for an empty file, which mmap can't map), unmapped on exit
+@contextlib.contextmanager
+def _map_file(f) -> Iterator:
+    if os.fstat(f.fileno()).st_size == 0:
+        yield b""
+        return
+    buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        yield buf
+    finally:
+        buf.close()
+
+# start of the first record at or after pos: pos itself if a line ends right before it, otherwise the
+# byte after the next newline (len(buf) if there is none). Also what the parallel byte ranges are cut on
+def _record_start(buf, pos: int) -> int:
+    if pos <= 0:
+        return 0
+    if pos >= len(buf) or buf[pos - 1] == 10:
+        return min(pos, len(buf))
+    newline = buf.find(b"\n", pos)
+    return len(buf) if newline < 0 else newline + 1
+
+# (date, merchant, amount) of every record in buf[start:end], fieldnames is the parsed header
+def _iter_mapped_fields(buf, start: int, end: int, fieldnames: List[str]) -> Iterator[Tuple[str, str, str]]:
+    # a field the header doesn't have points one past the last column, which is always padded with ""
+    missing = len(fieldnames)
+    d, m, a = (fieldnames.index(name) if name in fieldnames else missing for name in RAW_FIELDS)
+    width = max(d, m, a) + 1
+    find = buf.find
+    reader = csv.reader
+
+    pos = start
+    while pos < end:
+        newline = find(b"\n", pos, end)
+        stop = end if newline < 0 else newline
+        line = buf[pos:stop].rstrip(b"\r")
+        pos = stop + 1
+        # blank lines are skipped like DictReader does
+        if not line:
+            continue
+        if b'"' in line:
+            fields = next(reader([line.decode("utf-8")]))
+        else:
+            # decoding the whole line once is cheaper than decoding each field
+            fields = line.decode("utf-8").split(",")
+        if len(fields) < width:
+            fields += [""] * (width - len(fields))
+        yield fields[d], fields[m], fields[a]
+
+# header fields and the offset the data starts at
+def _mapped_header(buf) -> Tuple[List[str], int]:
+    data_start = _record_start(buf, 1) if len(buf) else 0
+    header = bytes(buf[:data_start]).decode("utf-8").rstrip("\r\n")
+    return next(csv.reader([header]), []), data_start
+
+
+# Parallel cleaning over byte ranges
+# --------------------------
+# cleaning is pure python and CPU bound, so big files are cut into byte ranges that each worker process
+# cleans on its own. Ranges always start and end on a record boundary (start of a line): the generator
+# never writes newlines inside a field, so every line after the header is one record
+
+# adds up two sets of counters (error stats or cache hit/miss dicts)
+def _merge_counts(total: Dict, part: Dict) -> None:
+    for key, value in part.items():
+        if isinstance(value, dict):
+            _merge_counts(total.setdefault(key, {}), value)
+        else:
+            total[key] = total.get(key, 0) + value
+
+# header line plus about `parts` (start, end) byte ranges covering the rest of the file
+def _split_byte_ranges(path: str, parts: int) -> Tuple[bytes, List[Tuple[int, int]]]:
+    with open(path, mode="rb") as f, _map_file(f) as buf:
+        size = len(buf)
+        data_start = _record_start(buf, 1) if size else 0
+        header = bytes(buf[:data_start])
+
+        bounds = [data_start]
+        for k in range(1, parts):
+            target = data_start + (size - data_start) * k // parts
+            if target <= bounds[-1]:
+                continue
+            # the next record after target, the line target falls in stays in the previous range
+            boundary = _record_start(buf, target)
+            if bounds[-1] < boundary < size:
+                bounds.append(boundary)
+        bounds.append(size)
+
+    ranges = [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1) if bounds[i] < bounds[i + 1]]
+    return header, ranges
+
+# decoded lines of one byte range
+# position (a one item list) is kept at the end of the last line handed out, for checkpoints, and digest
+# (a hashlib object) is fed every line's bytes, so it always covers the input up to position
+def _iter_range_lines(
+    f, start: int, end: int, position: Optional[List[int]] = None, digest=None,
+) -> Iterator[str]:
+    f.seek(start)
+    pos = start
+    while pos < end:
+        line = f.readline()
+        if not line:
+            break
+        pos += len(line)
+        if digest is not None:
+            digest.update(line)
+        if position is not None:
+            position[0] = pos
+        yield line.decode("utf-8")
+
+# worker: cleans one byte range of input_path into part_path (no header) and returns its counters
+def _clean_byte_range(
+    input_path: str,
+    fieldnames: List[str],
+    start: int,
+    end: int,
+    part_path: str,
+    cache_size: int,
+    alias_db: Optional[str] = None,
+    integer_cents: bool = False,
+    mmap_input: bool = False,
+    date_order: Optional[List[str]] = None,
+) -> Dict[str, object]:
+    aliases = load_aliases(alias_db) if alias_db else None
+    date_formats = new_date_formats(date_order) if date_order is not None else None
+    cleaners = _cached_cleaners(cache_size, aliases, integer_cents, date_formats)
+    stats = _new_stats()
+    with open(input_path, mode="rb") as f, open(part_path, mode="w", newline="", encoding="utf-8") as f_out:
+        writer = csv.DictWriter(f_out, fieldnames=CLEAN_FIELDS)
+        if mmap_input:
+            with _map_file(f) as buf:
+                for clean_row in _iter_clean_fields(_iter_mapped_fields(buf, start, end, fieldnames), stats, cleaners):
+                    writer.writerow(clean_row)
+        else:
+            reader = csv.DictReader(_iter_range_lines(f, start, end), fieldnames=fieldnames)
+            for clean_row in iter_clean_rows(reader, stats, cleaners):
+                writer.writerow(clean_row)
+
+    result: Dict[str, object] = dict(stats)
+    result["cache"] = _cache_stats(cleaners)
+    if date_formats is not None:
+        result["date_formats"] = _date_format_stats(date_formats)
+    if aliases is not None:
+        result["touched_aliases"] = _touched_aliases(aliases)
+    return result
+
+# cleans input_path into output_path with a pool of worker processes, one byte range each,
+# then stitches the part files together in input order so the output matches a single process run
+# learned aliases from all workers are merged and saved once at the end, each worker learns its own date
+# format order (date_order seeds all of them) and their counts are added up
+def _clean_csv_parallel(
+    input_path: str,
+    output_path: str,
+    workers: int,
+    cache_size: int,
+    alias_db: Optional[str] = None,
+    integer_cents: bool = False,
+    mmap_input: bool = False,
+    date_order: Optional[List[str]] = None,
+    background_compression: bool = False,
+) -> Dict[str, object]:
+    header, ranges = _split_byte_ranges(input_path, workers)
+    fieldnames = next(csv.reader([header.decode("utf-8")]))
+
+    # part files next to the output so the final copy stays on the same disk
+    part_dir = tempfile.mkdtemp(prefix=".clean_parts_", dir=os.path.dirname(os.path.abspath(output_path)))
+    try:
+        part_paths = [os.path.join(part_dir, f"part-{i:05d}.csv") for i in range(len(ranges))]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    _clean_byte_range,
+                    input_path, fieldnames, start, end, part_path, cache_size, alias_db, integer_cents, mmap_input,
+                    date_order,
+                )
+                for (start, end), part_path in zip(ranges, part_paths)
+            ]
+            part_results = [future.result() for future in futures]
+
+        # the parts are plain csv, only the joined output is compressed
+        with compressedio.open_text(output_path, "w", background_compression) as f_out:
+            csv.DictWriter(f_out, fieldnames=CLEAN_FIELDS).writeheader()
+            for part_path in part_paths:
+                with open(part_path, mode="r", newline="", encoding="utf-8") as f_part:
+                    shutil.copyfileobj(f_part, f_out)
+    finally:
+        shutil.rmtree(part_dir, ignore_errors=True)
+
+    aliases = load_aliases(alias_db) if alias_db else None
+    result: Dict[str, object] = _new_stats()
+    for part in part_results:
+        touched = part.pop("touched_aliases", None)
+        if aliases is not None and touched:
+            _merge_aliases(aliases, touched)
+        _merge_counts(result, part)
+    result.setdefault("cache", {})
+    if "date_formats" in result:
+        result["date_formats"] = _date_format_result(result["date_formats"])
+    if aliases is not None:
+        result["aliases"] = _alias_stats(aliases)
+        result["aliases"]["size"] = save_aliases(aliases, alias_db)
+    return result
+
+
+# where the cleaned data goes for an output format, output_file (default OUTPUT_FILE) with the format's
+# extension (a compressed output_file only compresses the csv, parquet and feather compress on their own)
+def output_path(output_format: str = "csv", output_file: Optional[str] = None) -> str:
+    if output_file is None:
+        output_file = OUTPUT_FILE
+    path = compressedio.strip_compression_extension(output_file)
+    extension = OUTPUT_EXTENSIONS[output_format]
+    if output_format == "csv":
+        extension += output_file[len(path):]
+    return os.path.splitext(path)[0] + extension
+
+# partitioned output goes to a directory named like output_file (default OUTPUT_FILE) without the extension
+def partition_dir(output_file: Optional[str] = None) -> str:
+    if output_file is None:
+        output_file = OUTPUT_FILE
+    return os.path.splitext(compressedio.strip_compression_extension(output_file))[0]
+
+def _write_table(table, path: str, output_format: str) -> None:
+    if output_format == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, path)
+    else:
+        import pyarrow.feather as feather
+        feather.write_feather(table, path)
+
+# writes a store as a parquet or feather file, atomically so readers never see half a file
+# date is date32, merchant dictionary encoded and amount_cents int64 (see TransactionStore.to_arrow)
+def _write_columnar(store: TransactionStore, path: str, output_format: str) -> None:
+    tmp_path = path + ".tmp"
+    _write_table(store.to_arrow(), tmp_path, output_format)
+    os.replace(tmp_path, path)
+
+# writes a store as one file per calendar month: root/year=2024/month=01/part-0.parquet
+# rows keep their input order inside a partition. The new tree is built next to root and swapped in
+# at the end, so readers see either the old partitions or the new ones
+def _write_partitioned(store: TransactionStore, root: str, output_format: str) -> Dict[str, int]:
+    import numpy as np
+
+    table = store.to_arrow()
+    # months since 1970-01 for every row, straight from the day ordinals
+    days = np.frombuffer(store.days, dtype=np.int32) - np.int32(date(1970, 1, 1).toordinal())
+    months = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+    parent = os.path.dirname(os.path.abspath(root))
+    tmp_root = tempfile.mkdtemp(prefix=".partitions_", dir=parent)
+    partitions: Dict[str, int] = {}
+    try:
+        order = np.argsort(months, kind="stable")
+        bounds = np.flatnonzero(np.diff(months[order])) + 1
+        for rows in np.split(order, bounds):
+            if not len(rows):
+                continue
+            year, month = divmod(int(months[rows[0]]), 12)
+            name = f"year={1970 + year}/month={month + 1:02d}"
+            os.makedirs(os.path.join(tmp_root, name))
+            _write_table(table.take(rows), os.path.join(tmp_root, name, f"part-0.{output_format}"), output_format)
+            partitions[name] = len(rows)
+
+        old_root = None
+        if os.path.exists(root):
+            old_root = tempfile.mkdtemp(prefix=".partitions_old_", dir=parent)
+            os.replace(root, os.path.join(old_root, "old"))
+        os.replace(tmp_root, root)
+        if old_root is not None:
+            shutil.rmtree(old_root, ignore_errors=True)
+    finally:
+        shutil.rmtree(tmp_root, ignore_errors=True)
+    return partitions
+
+
+# Incremental cleaning of an append-only input
+# --------------------------
+# the checkpoint remembers how far INPUT_FILE was cleaned (a byte offset at the end of a complete line),
+# a sha256 fingerprint of that prefix and the size of OUTPUT_FILE at that point. The next run checks the
+# fingerprint, cleans only the bytes after the offset and appends them to the output. Anything that doesn't
+# line up (different prefix, files, catalog, output size) means a full rebuild instead
+
+CHECKPOINT_FILE = "../datasets/synthetic_transactions_clean.checkpoint.json"
+
+# bytes read at a time while hashing the prefix
+CHECKPOINT_HASH_CHUNK = 1 << 20
+
+# sha256 of the whole prefix, so any edit before the offset (even one that keeps the length) forces a rebuild.
+# Hashing runs at about 1 GB/s, far below what cleaning those bytes again would cost. The hash object is
+# returned so a run can keep feeding it the lines it cleans (the checkpoints along the way never re-read
+# the input), the offset itself is stored next to the fingerprint
+def _prefix_hash(f, offset: int):
+    h = hashlib.sha256()
+    f.seek(0)
+    remaining = offset
+    while remaining > 0:
+        chunk = f.read(min(CHECKPOINT_HASH_CHUNK, remaining))
+        if not chunk:
+            break
+        h.update(chunk)
+        remaining -= len(chunk)
+    return h
+
+# end of the last complete line, an incremental run leaves a row still being appended for the next run
+def _complete_lines_end(f, size: int) -> int:
+    pos = size
+    while pos > 0:
+        start = max(0, pos - 65536)
+        f.seek(start)
+        chunk = f.read(pos - start)
+        newline = chunk.rfind(b"\n")
+        if newline >= 0:
+            return start + newline + 1
+        pos = start
+    return 0
+
+# whether offset is the start of a line. A fresh or resumed run cleans a last line without a newline too,
+# if more is appended to that line later its checkpoint can't be continued from
+def _at_line_start(f, offset: int, data_start: int) -> bool:
+    if offset <= data_start:
+        return True
+    f.seek(offset - 1)
+    return f.read(1) == b"\n"
+
+def load_checkpoint(path: str = CHECKPOINT_FILE) -> Optional[Dict]:
+    try:
+        with open(path, mode="r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+# written to a temp file, synced and renamed, a crash leaves either the old or the new checkpoint
+def _save_checkpoint(checkpoint: Dict, path: str) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, mode="w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    # the rename itself is only durable once the directory is synced (not possible on every OS)
+    try:
+        dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+# makes everything written so far durable, then records it: offset is where the input was read up to,
+# fingerprint the sha256 of the input before it and totals the counters for everything before it.
+# date_order is the learned date format order, if any, the next run starts from it
+def _write_checkpoint(
+    f_out,
+    fingerprint: str,
+    offset: int,
+    totals: Dict[str, int],
+    files: Dict[str, str],
+    path: str,
+    date_order: Optional[List[str]] = None,
+) -> None:
+    f_out.flush()
+    os.fsync(f_out.fileno())
+    checkpoint = dict(files)
+    checkpoint.update({
+        "offset": offset,
+        "fingerprint": fingerprint,
+        "output_size": os.fstat(f_out.fileno()).st_size,
+        "totals": totals,
+    })
+    if date_order is not None:
+        checkpoint["date_order"] = date_order
+    _save_checkpoint(checkpoint, path)
+
+# the order to save with a checkpoint: what this run learned, or the one it started from if it saw no dates
+def _checkpoint_date_order(date_formats: Optional[Dict]) -> Optional[List[str]]:
+    if date_formats is None:
+        return None
+    return date_format_order(date_formats) or date_formats["order"]
+
+# rows between periodic checkpoints of a checkpointed run (incremental, resume or checkpoint_every)
+CHECKPOINT_EVERY = 1000000
+
+# clean_csv(incremental=True / resume=True): cleans what comes after the checkpoint's offset in input_file,
+# which is the rows appended since the last run, or the rest of a run that crashed
+# every checkpoint_every rows the output is synced and a new checkpoint saved, so a crash loses at most
+# that many rows of work and the resumed output is identical to an uninterrupted run
+# fresh=True ignores any existing checkpoint (a new checkpointed run from the start)
+# incremental=True stops at the last complete line, fresh and resumed runs clean to the end of the file
+# result counters are for this run's rows, "totals" adds up every run since the last full rebuild
+# with adaptive dates (date_order not None) the learned order is kept in the checkpoint, and an empty
+# date_order starts from the order saved there
+def _clean_csv_incremental(
+    input_file: str,
+    output_file: str,
+    cache_size: int,
+    alias_db: Optional[str],
+    integer_cents: bool,
+    checkpoint_path: str,
+    checkpoint_every: int = CHECKPOINT_EVERY,
+    fresh: bool = False,
+    date_order: Optional[List[str]] = None,
+    incremental: bool = False,
+) -> Dict[str, object]:
+    files = {
+        "input": os.path.abspath(input_file),
+        "output": os.path.abspath(output_file),
+        "catalog": merchantcatalog.load_compiled()["version"],
+    }
+    checkpoint = None
+    if fresh:
+        # the old checkpoint describes an output this run is about to overwrite
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+    else:
+        checkpoint = load_checkpoint(checkpoint_path)
+
+    aliases = load_aliases(alias_db) if alias_db else None
+    if date_order == [] and checkpoint is not None:
+        date_order = checkpoint.get("date_order", [])
+    date_formats = new_date_formats(date_order) if date_order is not None else None
+    cleaners = _cached_cleaners(cache_size, aliases, integer_cents, date_formats)
+    stats = _new_stats()
+
+    # f is read by the csv reader, f_input is for checking the checkpoint so it never moves f's position
+    with open(input_file, mode="rb") as f, open(input_file, mode="rb") as f_input:
+        header = f.readline()
+        data_start = f.tell()
+        end = os.path.getsize(input_file)
+        if incremental:
+            end = max(data_start, _complete_lines_end(f, end))
+
+        resume = (
+            checkpoint is not None
+            and all(checkpoint.get(key) == value for key, value in files.items())
+            and data_start <= checkpoint["offset"] <= end
+            and _at_line_start(f_input, checkpoint["offset"], data_start)
+            and os.path.exists(output_file)
+            and os.path.getsize(output_file) >= checkpoint["output_size"]
+        )
+        # digest covers the input up to where the reader is, fed line by line from here on, so a checkpoint
+        # costs nothing to fingerprint. Resuming hashes the checked prefix once, a fresh run only the header
+        if resume:
+            digest = _prefix_hash(f_input, checkpoint["offset"])
+            resume = digest.hexdigest() == checkpoint["fingerprint"]
+        if not resume:
+            digest = hashlib.sha256(header)
+        start = checkpoint["offset"] if resume else data_start
+        previous = checkpoint["totals"] if resume else _new_stats()
+
+        # position[0] is the end of the last line handed to the reader, the reader takes one line per
+        # record, so whenever a row comes out everything before position[0] has been cleaned
+        position = [start]
+        fieldnames = next(csv.reader([header.decode("utf-8")]))
+        reader = csv.DictReader(_iter_range_lines(f, start, end, position, digest), fieldnames=fieldnames)
+        if resume:
+            # rows written after the last checkpoint (a run that died before saving it) are dropped and redone
+            with open(output_file, mode="r+b") as f_trunc:
+                f_trunc.truncate(checkpoint["output_size"])
+            f_out = open(output_file, mode="a", newline="", encoding="utf-8")
+        else:
+            f_out = open(output_file, mode="w", newline="", encoding="utf-8")
+        with f_out:
+            writer = csv.DictWriter(f_out, fieldnames=CLEAN_FIELDS)
+            if not resume:
+                writer.writeheader()
+            next_checkpoint = checkpoint_every
+            for clean_row in iter_clean_rows(reader, stats, cleaners):
+                writer.writerow(clean_row)
+                if checkpoint_every and stats["total_rows"] >= next_checkpoint:
+                    totals = dict(stats)
+                    _merge_counts(totals, previous)
+                    _write_checkpoint(
+                        f_out, digest.hexdigest(), position[0], totals, files, checkpoint_path,
+                        _checkpoint_date_order(date_formats),
+                    )
+                    next_checkpoint = stats["total_rows"] + checkpoint_every
+
+            totals = dict(stats)
+            _merge_counts(totals, previous)
+            _write_checkpoint(
+                f_out, digest.hexdigest(), position[0], totals, files, checkpoint_path,
+                _checkpoint_date_order(date_formats),
+            )
+
+    result: Dict[str, object] = dict(stats)
+    result["incremental"] = {"resumed": resume, "skipped_bytes": start - data_start, "cleaned_bytes": end - start}
+    result["totals"] = totals
+    result["cache"] = _cache_stats(cleaners)
+    if date_formats is not None:
+        result["date_formats"] = _date_format_result(_date_format_stats(date_formats))
+    if aliases is not None:
+        result["aliases"] = _alias_stats(aliases)
+        result["aliases"]["size"] = save_aliases(aliases, alias_db)
+    return result
+
+
+# Result cache
+# --------------------------
+# clean_csv(result_cache=True) stores its counters next to the output (result_cache_path), under a key of
+# the input's sha256, the merchant catalog version, CLEANER_VERSION and the options that change what gets
+# written (output format, partitioning, integer_cents). The next run with the same key, and an output that is
+# still what that run wrote (same size and mtime, of every file for a partitioned output), returns those
+# counters without cleaning anything. A different input, catalog or cleaner just runs and replaces the entry.
+# The input is only hashed when its size or mtime differ from the entry's, so an untouched file costs a few
+# stat calls and a re-touched file with the same bytes is hashed once and still hits
+
+# bump whenever a change to the cleaning code changes what gets written
+CLEANER_VERSION = 2
+
+# where the cached result for an output lives
+def result_cache_path(out_path: str) -> str:
+    return out_path + ".result.json"
+
+def _file_stat(path: str) -> Optional[Dict[str, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+# _file_stat of an output file, or of every file under a partitioned output ({relative path: stat}), so a
+# partition file rewritten in place is noticed even though the directory itself didn't change
+def _output_stat(path: str):
+    if not os.path.isdir(path):
+        return _file_stat(path)
+    manifest = {}
+    for directory, _, names in os.walk(path):
+        for name in names:
+            file_path = os.path.join(directory, name)
+            manifest[os.path.relpath(file_path, path)] = _file_stat(file_path)
+    return manifest
+
+def _file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, mode="rb") as f:
+        for block in iter(functools.partial(f.read, 1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+# (stored result or None, entry for _save_result_cache). options are the ones that change the output
+def _result_cache_lookup(input_file: str, out_path: str, options: Dict[str, object]) -> Tuple[Optional[Dict], Dict]:
+    entry = _read_result_cache(out_path)
+    input_stat = _file_stat(input_file)
+    if entry is not None and entry.get("input") == input_stat:
+        digest = entry["key"]["input_sha256"]
+    else:
+        digest = _file_sha256(input_file)
+    key = {
+        "input_sha256": digest,
+        "catalog": merchantcatalog.load_compiled()["version"],
+        "cleaner": CLEANER_VERSION,
+    }
+    key.update(options)
+    new_entry = {"key": key, "input": input_stat, "output": os.path.abspath(out_path)}
+
+    if (
+        entry is None
+        or entry.get("key") != key
+        or entry.get("output") != new_entry["output"]
+        or entry.get("output_stat") != _output_stat(out_path)
+    ):
+        return None, new_entry
+    if entry["input"] != input_stat:
+        # same bytes, new mtime: remember it so the next run doesn't hash again
+        entry["input"] = input_stat
+        _write_result_cache(entry, out_path)
+    result = dict(entry["result"])
+    result["cached"] = True
+    return result, entry
+
+def _read_result_cache(out_path: str) -> Optional[Dict]:
+    try:
+        with open(result_cache_path(out_path), mode="r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_result_cache(entry: Dict, out_path: str) -> None:
+    path = result_cache_path(out_path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, mode="w", encoding="utf-8") as f:
+        json.dump(entry, f, indent=2)
+    os.replace(tmp_path, path)
+
+# records a finished run (only the json-friendly counters, not the rows or the store)
+def _save_result_cache(entry: Dict, out_path: str, result: Dict[str, object]) -> None:
+    entry["output_stat"] = _output_stat(out_path)
+    entry["result"] = {key: value for key, value in result.items() if key not in ("store", "cleaned_rows")}
+    _write_result_cache(entry, out_path)
+    result["cached"] = False
+
+
+# streams INPUT_FILE to OUTPUT_FILE, every cleaned row is written as soon as it's produced so memory
+# stays flat no matter how big the file is. keep_rows=True also collects them into "cleaned_rows"
+# (what main() uses to list the unique merchants)
+# workers > 1 cleans byte ranges of the file in that many processes (None = one per CPU), same output
+# alias_db (e.g. ALIAS_DB) turns on the persistent learned alias table for merchants
+# integer_cents=True parses amounts with parse_amount_cents (int cents, formatted when written), same output
+# keep_store=True collects the rows into a compact TransactionStore ("store") instead of dicts, it needs
+# integer cents so it turns integer_cents on
+# output_format (default OUTPUT_FORMAT) "parquet" or "feather" writes output_path(format) instead of the csv,
+# built from a TransactionStore, so those formats keep 14 bytes per row in memory until the file is written
+# partitioned=True writes those formats as one file per year/month under partition_dir() instead
+# (parquet if output_format is left at csv), "partitions" in the result has the row count of each
+# incremental=True only cleans rows appended to INPUT_FILE since the last run (csv output, one process),
+# see _clean_csv_incremental. resume=True is the same thing after a crash: it continues a checkpointed run
+# from its last checkpoint. checkpoint_every=N makes a fresh run save a checkpoint every N rows
+# (checkpointed runs default to CHECKPOINT_EVERY)
+# mmap_input=True reads INPUT_FILE through a memory map instead of csv.DictReader (see _iter_mapped_fields)
+# a compressed INPUT_FILE or OUTPUT_FILE is streamed through its codec (compressedio), and
+# background_compression=True runs the codec in a second thread. The modes that work on byte offsets of the
+# raw files (workers > 1, mmap_input, checkpointed runs) need them uncompressed
+# input_file / output_file clean another file than INPUT_FILE / OUTPUT_FILE (the other output formats and the
+# partition directory are named after output_file), clean_files runs many of them at once
+# result_cache=True skips the cleaning when input, catalog and cleaner haven't changed since the last run and
+# returns that run's counters ("cached" in the result says which happened), see the Result cache section
+# adaptive_dates=True lets parse_date learn which date format dominates and try it first, same output.
+# "date_formats" in the result has the hits per format and the learned "order", pass that back as
+# date_order to start the next run of a similar feed from it (date_order alone turns adaptive_dates on)
+def clean_csv(
+    cache_size: int = CACHE_SIZE,
+    keep_rows: bool = False,
+    workers: Optional[int] = 1,
+    alias_db: Optional[str] = None,
+    integer_cents: bool = False,
+    keep_store: bool = False,
+    output_format: Optional[str] = None,
+    partitioned: bool = False,
+    incremental: bool = False,
+    checkpoint_path: str = CHECKPOINT_FILE,
+    resume: bool = False,
+    checkpoint_every: Optional[int] = None,
+    mmap_input: bool = False,
+    adaptive_dates: bool = False,
+    date_order: Optional[List[str]] = None,
+    background_compression: bool = False,
+    input_file: Optional[str] = None,
+    output_file: Optional[str] = None,
+    result_cache: bool = False,
+) -> Dict[str, object]:
+    if input_file is None:
+        input_file = INPUT_FILE
+    if output_file is None:
+        output_file = OUTPUT_FILE
+    if output_format is None:
+        output_format = OUTPUT_FORMAT
+    # from here on date_order is None when the order isn't adaptive
+    date_order = list(date_order or []) if adaptive_dates or date_order else None
+    if result_cache and (keep_rows or keep_store or incremental or resume or checkpoint_every):
+        raise ValueError("result_cache only keeps counters, it can't keep rows or run checkpointed")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    compressed_input = compressedio.detect_compression(input_file) is not None
+    if compressed_input and (workers > 1 or mmap_input):
+        raise ValueError("workers > 1 and mmap_input split the raw bytes of the input, it can't be compressed")
+    if incremental or resume or checkpoint_every:
+        if output_format != "csv" or partitioned or keep_rows or keep_store:
+            raise ValueError("checkpointed cleaning appends to the csv output only")
+        if compressed_input or compressedio.compression_from_extension(output_file) is not None:
+            raise ValueError("checkpointed cleaning works on byte offsets, the input and output can't be compressed")
+        return _clean_csv_incremental(
+            input_file, output_file, cache_size, alias_db, integer_cents, checkpoint_path,
+            checkpoint_every=CHECKPOINT_EVERY if checkpoint_every is None else checkpoint_every,
+            fresh=not (incremental or resume),
+            date_order=date_order,
+            incremental=incremental,
+        )
+    if partitioned and output_format == "csv":
+        output_format = "parquet"
+    columnar = output_format != "csv"
+    out_path = partition_dir(output_file) if partitioned else output_path(output_format, output_file)
+    keep_store = keep_store or columnar
+    integer_cents = integer_cents or keep_store
+    cache_entry = None
+    if result_cache:
+        # integer cents write some amounts differently (inf/nan are errors, -0.00 is 0.00)
+        cached, cache_entry = _result_cache_lookup(
+            input_file, out_path,
+            {"output_format": output_format, "partitioned": partitioned, "integer_cents": integer_cents},
+        )
+        if cached is not None:
+            return cached
+    if workers > 1:
+        # columnar output: the workers' csv is converted and removed afterwards
+        csv_path = out_path + ".csv.tmp" if columnar else output_file
+        result = _clean_csv_parallel(
+            input_file, csv_path, workers, cache_size, alias_db, integer_cents, mmap_input, date_order,
+            background_compression,
+        )
+        if keep_rows or keep_store:
+            with compressedio.open_text(csv_path, "r", background_compression) as f:
+                rows = csv.DictReader(f)
+                if keep_store:
+                    result["store"] = TransactionStore.from_rows(rows)
+                else:
+                    result["cleaned_rows"] = list(rows)
+        if columnar:
+            os.remove(csv_path)
+            if partitioned:
+                result["partitions"] = _write_partitioned(result["store"], out_path, output_format)
+            else:
+                _write_columnar(result["store"], out_path, output_format)
+            if keep_rows:
+                result["cleaned_rows"] = list(result["store"])
+        if cache_entry is not None:
+            _save_result_cache(cache_entry, out_path, result)
+        return result
+
+    # per run caches so counters (and memory) start fresh every time
+    aliases = load_aliases(alias_db) if alias_db else None
+    date_formats = new_date_formats(date_order) if date_order is not None else None
+    cleaners = _cached_cleaners(cache_size, aliases, integer_cents, date_formats)
+
+    #keepign track of rows and errors
+    stats = _new_stats()
+    cleaned_rows: List[Dict[str, str]] = []
+    store = TransactionStore() if keep_store else None
+
+    # create and fill new csv with clean values
+    with contextlib.ExitStack() as files:
+        if mmap_input:
+            f = files.enter_context(open(input_file, mode="rb"))
+            buf = files.enter_context(_map_file(f))
+            fieldnames, data_start = _mapped_header(buf)
+            clean_rows = _iter_clean_fields(_iter_mapped_fields(buf, data_start, len(buf), fieldnames), stats, cleaners)
+        else:
+            f = files.enter_context(compressedio.open_text(input_file, "r", background_compression))
+            clean_rows = iter_clean_rows(csv.DictReader(f), stats, cleaners)
+        writer = None
+        if not columnar:
+            f_out = files.enter_context(compressedio.open_text(output_file, "w", background_compression))
+            writer = csv.DictWriter(f_out, fieldnames=CLEAN_FIELDS)
+            writer.writeheader()
+
+        for clean_row in clean_rows:
+            if writer is not None:
+                writer.writerow(clean_row)
+            if store is not None:
+                store.append_row(clean_row)
+            elif keep_rows:
+                cleaned_rows.append(clean_row)
+
+    result: Dict[str, object] = dict(stats)
+    if partitioned:
+        result["partitions"] = _write_partitioned(store, out_path, output_format)
+    elif columnar:
+        _write_columnar(store, out_path, output_format)
+
+    if store is not None:
+        result["store"] = store
+        if keep_rows:
+            result["cleaned_rows"] = list(store)
+    elif keep_rows:
+        result["cleaned_rows"] = cleaned_rows
+    result["cache"] = _cache_stats(cleaners)
+    if date_formats is not None:
+        result["date_formats"] = _date_format_result(_date_format_stats(date_formats))
+    if aliases is not None:
+        result["aliases"] = _alias_stats(aliases)
+        result["aliases"]["size"] = save_aliases(aliases, alias_db)
+    if cache_entry is not None:
+        _save_result_cache(cache_entry, out_path, result)
+    return result
+
+
+# Batch cleaning
+# --------------------------
+# many raw files (one per account) cleaned at once, each into its own output, on a pool of worker processes.
+# One process per file: files are small next to the process startup, so splitting each of them up
+# (clean_csv(workers=N)) wouldn't pay off
+
+# raw files picked up from a directory (compressed ones too)
+BATCH_EXTENSIONS = (".csv",) + tuple(".csv" + ext for ext in compressedio.COMPRESSION_EXTENSIONS)
+# what's added to a raw file's name for its cleaned output ("account.csv" -> "account_clean.csv")
+BATCH_OUTPUT_SUFFIX = "_clean"
+
+# clean_csv options that don't work per file in a batch
+_BATCH_UNSUPPORTED = ("keep_rows", "keep_store", "incremental", "resume", "checkpoint_every", "checkpoint_path")
+
+# whether a file name is a cleaned output of an earlier batch (batch_output_file)
+def _is_batch_output(path: str) -> bool:
+    name = os.path.basename(compressedio.strip_compression_extension(path))
+    return os.path.splitext(name)[0].endswith(BATCH_OUTPUT_SUFFIX)
+
+# the raw files of a directory or of a glob pattern, sorted. Either way only BATCH_EXTENSIONS files count
+# and cleaned outputs of earlier runs are skipped, so running the same batch again doesn't clean them (or
+# their result_cache_path files) into "_clean_clean" files
+def batch_input_files(source: str) -> List[str]:
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source)]
+    else:
+        paths = [path for path in glob.glob(source) if os.path.isfile(path)]
+    return sorted(
+        path for path in paths
+        if path.lower().endswith(BATCH_EXTENSIONS) and not _is_batch_output(path)
+    )
+
+# output of one raw file: same name plus BATCH_OUTPUT_SUFFIX, same compression, in output_dir
+# (default next to the raw file)
+def batch_output_file(input_file: str, output_dir: Optional[str] = None) -> str:
+    path = compressedio.strip_compression_extension(input_file)
+    name = os.path.splitext(os.path.basename(path))[0] + BATCH_OUTPUT_SUFFIX + ".csv" + input_file[len(path):]
+    return os.path.join(output_dir if output_dir is not None else os.path.dirname(input_file), name)
+
+# (input, output) per raw file. With output_dir, inputs from several directories keep their layout under it
+# (relative to the directory they have in common), so same-named files ("in/a/transactions.csv",
+# "in/b/transactions.csv") never share an output
+def _batch_jobs(input_files: List[str], output_dir: Optional[str]) -> List[Tuple[str, str]]:
+    if output_dir is None or not input_files:
+        jobs = [(input_file, batch_output_file(input_file)) for input_file in input_files]
+    else:
+        directories = [os.path.dirname(os.path.abspath(input_file)) for input_file in input_files]
+        common = os.path.commonpath(directories)
+        jobs = []
+        for input_file, directory in zip(input_files, directories):
+            mirrored = os.path.normpath(os.path.join(output_dir, os.path.relpath(directory, common)))
+            jobs.append((input_file, batch_output_file(input_file, mirrored)))
+    # two inputs writing one output would lose rows silently, whatever is left over (e.g. file names that
+    # only differ in case on a case-insensitive file system) is an error up front
+    seen: Dict[str, str] = {}
+    for input_file, output_file in jobs:
+        key = os.path.normcase(os.path.abspath(output_file))
+        if key in seen:
+            raise ValueError(f"{seen[key]} and {input_file} would both be cleaned into {output_file}")
+        seen[key] = input_file
+    return jobs
+
+# worker: one file through clean_csv, only the counters go back to the parent
+# a file that fails doesn't leave half an output behind
+def _clean_batch_file(input_file: str, output_file: str, options: Dict[str, object]) -> Dict[str, object]:
+    try:
+        result = clean_csv(input_file=input_file, output_file=output_file, **options)
+    except Exception:
+        if os.path.isfile(output_file):
+            os.remove(output_file)
+        raise
+    stats = {key: result[key] for key in _new_stats()}
+    stats["cache"] = result["cache"]
+    if "cached" in result:
+        stats["cached"] = result["cached"]
+    return stats
+
+# cleans every raw file of source (a directory or glob pattern) into its own output (batch_output_file) on
+# a pool of `workers` processes (None = one per CPU, 1 = in this process), other options go to clean_csv
+# the result adds up total_rows, rows_kept, date_errors, amount_errors, merchant_unmapped and the cache
+# counters of all files, "files" has each file's output and counters. A file that fails is listed in
+# "failed" (path -> error) and the rest of the batch still runs
+# with result_cache=True unchanged files are skipped, "cached_files" counts them
+def clean_files(
+    source: str,
+    output_dir: Optional[str] = None,
+    workers: Optional[int] = None,
+    **options,
+) -> Dict[str, object]:
+    unsupported = [name for name in _BATCH_UNSUPPORTED if name in options]
+    if unsupported:
+        raise ValueError(f"clean_files cleans each file in one process, can't use: {', '.join(unsupported)}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    jobs = _batch_jobs(batch_input_files(source), output_dir)
+    if output_dir is not None:
+        for directory in {os.path.dirname(output_file) for _, output_file in jobs} | {output_dir}:
+            os.makedirs(directory, exist_ok=True)
+    file_results: Dict[str, Dict[str, object]] = {}
+    failed: Dict[str, str] = {}
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            futures = {
+                input_file: pool.submit(_clean_batch_file, input_file, output_file, options)
+                for input_file, output_file in jobs
+            }
+            for input_file, future in futures.items():
+                try:
+                    file_results[input_file] = future.result()
+                except Exception as exc:
+                    failed[input_file] = f"{type(exc).__name__}: {exc}"
+    else:
+        for input_file, output_file in jobs:
+            try:
+                file_results[input_file] = _clean_batch_file(input_file, output_file, options)
+            except Exception as exc:
+                failed[input_file] = f"{type(exc).__name__}: {exc}"
+
+    result: Dict[str, object] = _new_stats()
+    result["cache"] = {}
+    result["files"] = {}
+    result["cached_files"] = 0
+    for input_file, output_file in jobs:
+        stats = file_results.get(input_file)
+        if stats is None:
+            continue
+        result["files"][input_file] = dict(stats, output=output_file)
+        if stats.pop("cached", False):
+            result["cached_files"] += 1
+        _merge_counts(result, stats)
+    result["failed"] = failed
+    return result
+
 
 def main():
     #run clean_csv and print out statistics
-    result = clean_csv()
+    result = clean_csv(keep_store=True)
 
-    cleaned_rows = result["cleaned_rows"]
+    store = result["store"]
     total_rows = result["total_rows"]
     date_errors = result["date_errors"]
     amount_errors = result["amount_errors"]
     merchant_unmapped = result["merchant_unmapped"]
 
     print(f"Total raw rows:       {total_rows}")
-    print(f"Rows kept:            {len(cleaned_rows)}")
+    print(f"Rows kept:            {result['rows_kept']}")
     print(f"Date parse errors:    {date_errors}")
     print(f"Amount parse errors:  {amount_errors}")
     print(f"Unmapped merchants:   {merchant_unmapped}")
+    for field, counts in result["cache"].items():
+        print(f"{field.capitalize() + ' cache:':<22}{counts['hits']} hits, {counts['misses']} misses")
+
+    print(f"Cleaned rows in memory: {store.nbytes():,} bytes")
 
-    unique_merchants = sorted(set(r["merchant"] for r in cleaned_rows))
+    unique_merchants = sorted(store.merchants)
     print(f"Unique merchants ({len(unique_merchants)}):")
     for m in unique_merchants:
         print("  ", m)
@@ -350,22 +2216,25 @@ def main():
 def cleaning_demo():
     print("Now, we can clean the raw synthetic transactions file.")
     print(f"Input file:  {INPUT_FILE}")
-    print(f"Output file: {OUTPUT_FILE}")
+    print(f"Output file: {output_path(OUTPUT_FORMAT)}")
     print("\nProceed with cleaning? (y/n)")
 
     choice = input(">> ").strip().lower()
 
     if choice == "y":
-        result = clean_csv()
+        # an unchanged raw file (same bytes, catalog and cleaner) reuses the last run's output
+        result = clean_csv(result_cache=True)
+        if result["cached"]:
+            print("Raw file unchanged since the last run, reusing the cleaned output.")
 
-        cleaned_rows = result["cleaned_rows"]
+        rows_kept = result["rows_kept"]
         total_rows = result["total_rows"]
         date_errors = result["date_errors"]
         amount_errors = result["amount_errors"]
         merchant_unmapped = result["merchant_unmapped"]
     
         print(f"Total raw rows:       {total_rows}")
-        print(f"Rows kept:            {len(cleaned_rows)}")
+        print(f"Rows kept:            {rows_kept}")
         print(f"Date parse errors:    {date_errors}")
         print(f"Amount parse errors:  {amount_errors}")
         print(f"Unmapped merchants:   {merchant_unmapped}")
@@ -386,17 +2255,21 @@ if __name__ == "__main__":
 # In[249]:
 
 
-#sanity check
-import pandas as pd
+#sanity check, only when run directly: worker processes re-import this module (spawn / forkserver)
+# and shouldn't each read the whole cleaned csv
+if __name__ == "__main__":
+    import pandas as pd
 
-df = pd.read_csv(OUTPUT_FILE)
-df.head()
+    df = pd.read_csv(OUTPUT_FILE)
+    print(df.head())
 
 
 # In[250]:
 
 
-CANONICAL_BASES
+# only when run directly, importing the module leaves the catalog unloaded until it's needed
+if __name__ == "__main__":
+    print(canonical_bases())
 
 
 # In[ ]:
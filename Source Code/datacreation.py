@@ -8,11 +8,15 @@ import csv
 import random
 from datetime import date, timedelta 
 
+import compressedio
+import merchantcatalog
+
 # global variables (rows, start/end date, output path)
 
 START_DATE = date(2019, 1, 1)
 END_DATE = date(2025, 12, 31)
 OUTPUT_FILE = OUTPUT_FILE = "../datasets/synthetic_transactions.csv"
+# (a .gz/.bz2/.xz OUTPUT_FILE is written compressed, see compressedio)
 
 # Helper Functions
 # 1. Date helpers
@@ -115,27 +119,21 @@ def format_date_mixed(d: date) -> str:
 # 19 different Merchants 2-4 different names for each generation
 # Restaurant, Retail, and Service all have unique values, the other 16 categories should all map to the key, total should be 27 unique
 # -----------------------
-BASE_MERCHANTS = {
-    "UBER": ["UBER", "Uber", "Uber Technologies", "UBER EATS", "UBER *TRIP"],
-    "STARBUCKS": ["Starbucks", "STARBUCKS", "Starbucks Coffee"],
-    "AMAZON": ["Amazon", "AMZN", "Amazon Marketplace"],
-    "WALMART": ["Walmart", "WAL-MART", "Walmart Supercenter"],
-    "TARGET": ["Target", "TARGET", "Target Store"],
-    "MCDONALDS": ["McDonalds", "McDonald's", "MCD"],
-    "SHELL": ["Shell", "Shell Oil", "SHELL GAS"],
-    "LYFT": ["Lyft", "LYFT RIDE"],
-    "SPOTIFY": ["Spotify", "SPOTIFY", "Spotify Pmnt"],
-    "NETFLIX": ["Netflix", "NETFLIX", "Netflix.com"],
-    "APPLE": ["Apple", "APPLE.COM/BILL", "Apple Services"],
-    "GOOGLE": ["Google", "GOOGLE *SERVICES", "Google Play"],
-    "DOORDASH": ["DoorDash", "DOORDASH", "DOORDASH*ORDER"],
-    "INSTACART": ["Instacart", "INSTACART"],
-    "AIRBNB": ["Airbnb", "AIRBNB", "AIRBNB PAY"],
-    "COSTCO": ["Costco", "COSTCO WHOLESALE"],
-    "RESTAURANT": ["Olive Garden", "Chipotle", "Panda Express", "Sushi House"],
-    "RETAIL": ["Best Buy", "Home Depot", "LOWE'S", "Macy's"],
-    "SERVICE": ["City Utilities", "Gym Membership", "Car Wash Pro"],
-}
+# the families and their names live in merchant_catalog.json (shared with datacleaning), grouped by category
+# BASE_MERCHANTS = {CATEGORY: [names]}, loaded on first use
+_BASE_MERCHANTS = None
+
+def _base_merchants() -> dict:
+    global _BASE_MERCHANTS
+    if _BASE_MERCHANTS is None:
+        _BASE_MERCHANTS = merchantcatalog.load_compiled()["creation_merchants"]
+    return _BASE_MERCHANTS
+
+# datacreation.BASE_MERCHANTS still works as a module attribute
+def __getattr__(name: str):
+    if name == "BASE_MERCHANTS":
+        return _base_merchants()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # randomization for merchant names (upper/lower/title/mixed case)
 def random_case_variant(s: str) -> str:
@@ -220,8 +218,9 @@ def maybe_add_regex_noise(s: str) -> str:
 # putting all merchant helpers together, maybes happen with a chance (already implemented within maybes)
 def random_merchant() -> str:
     # Choose a merchant family and base name
-    family = random.choice(list(BASE_MERCHANTS.keys()))
-    base_name = random.choice(BASE_MERCHANTS[family])
+    base_merchants = _base_merchants()
+    family = random.choice(list(base_merchants.keys()))
+    base_name = random.choice(base_merchants[family])
 
     # Apply transformations
     s = base_name
@@ -307,21 +306,229 @@ def format_amount_mixed() -> str:
 
 
 
+# Bulk generation (NumPy)
+# -----------------------
+# the same noise model as the helpers above, but every random decision of a batch is drawn at once as a
+# NumPy array and the strings are put together from lookup tables (every date in every format, every
+# merchant name in every case, every whole dollar amount) with elementwise + on object arrays.
+# The per character noise (mixed case, typos) works on a matrix of code points of just the rows that get it.
+# Statistically the same rows as main(), not the same sequence: NumPy draws from its own generator,
+# seeded from `random` so random.seed() still makes a bulk file reproducible.
+# numpy is only needed for bulk mode, so it's imported inside these functions
+
+# rows generated and written per batch, bounds the memory of a bulk run
+BULK_BATCH_ROWS = 500000
+
+# creation_demo switches to bulk mode from this many rows
+BULK_MIN_ROWS = 100000
+
+# the format_date_mixed variants, in the order of the table _bulk_date_table builds
+# format i (picked uniformly like random.choice) is variant _DATE_VARIANT_START[i] plus its padding coin
+_MONTHS_SHORT = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+_DATE_VARIANT_START = [0, 2, 4, 6, 7, 9]
+_DATE_VARIANT_COIN = [1, 1, 1, 0, 1, 1]
+
+def _date_variants(d: date) -> list:
+    year_short = d.year % 100
+    mmm = _MONTHS_SHORT[d.month - 1]
+    return [
+        f"{d.year}-{d.month:02d}-{d.day:02d}",
+        f"{d.year}-{d.month}-{d.day}",
+        f"{d.month:02d}/{d.day:02d}/{d.year}",
+        f"{d.month}/{d.day}/{d.year}",
+        f"{mmm} {d.day:02d} {d.year}",
+        f"{mmm} {d.day} {d.year}",
+        f"{mmm} {d.day}{day_suffix(d.day)} {year_short:02d}",
+        f"{d.day}-{d.month}-{year_short:02d}",
+        f"{d.day:02d}-{d.month:02d}-{year_short:02d}",
+        f"{d.day} {mmm} {year_short:02d}",
+        f"{d.day} {mmm} {d.year}",
+    ]
+
+# strings as a (rows, longest) matrix of code points, shorter ones padded with 0
+def _code_points(strings: list):
+    import numpy as np
+
+    width = max(1, max(len(x) for x in strings))
+    return np.array(strings, dtype=f"<U{width}").view(np.uint32).reshape(len(strings), width)
+
+# back from _code_points to an object array of str (the padding drops off)
+def _from_code_points(chars):
+    import numpy as np
+
+    chars = np.ascontiguousarray(chars, dtype=np.uint32)
+    return chars.view(f"<U{chars.shape[1]}").ravel().astype(object)
+
+# a column of csv fields, quoted where csv.writer would (a comma, quote or line break in the value)
+def _csv_column(values):
+    import numpy as np
+
+    text = values.astype(str)
+    quote = np.zeros(len(values), dtype=bool)
+    for ch in (",", '"', "\r", "\n"):
+        quote |= np.char.find(text, ch) >= 0
+    rows = np.flatnonzero(quote)
+    values[rows] = ['"' + value.replace('"', '""') + '"' for value in values[rows]]
+    return values
+
+# every day from START_DATE to END_DATE in every format variant, [day offset, variant]
+def _bulk_date_table():
+    import numpy as np
+
+    days = (END_DATE - START_DATE).days + 1
+    table = np.array([_date_variants(START_DATE + timedelta(days=offset)) for offset in range(days)], dtype=object)
+    return _csv_column(table.ravel()).reshape(table.shape)
+
+def _bulk_dates(rng, n: int, table):
+    import numpy as np
+
+    offsets = rng.integers(0, table.shape[0], n)
+    formats = rng.integers(0, len(_DATE_VARIANT_START), n)
+    coins = rng.random(n) < 0.5
+    variants = np.array(_DATE_VARIANT_START)[formats] + coins * np.array(_DATE_VARIANT_COIN)[formats]
+    return table[offsets, variants]
+
+# same choices as random_merchant: family, name, case, typo, prefix/suffix, regex noise, spaces
+def _bulk_merchants(rng, n: int):
+    import numpy as np
+
+    families = list(_base_merchants().values())
+    names = [name for family in families for name in family]
+    starts = np.cumsum([0] + [len(family) for family in families[:-1]])
+    sizes = np.array([len(family) for family in families])
+
+    family = rng.integers(0, len(families), n)
+    name_ids = starts[family] + (rng.random(n) * sizes[family]).astype(np.int64)
+
+    # upper, lower, title from a table, mixed (5%) flips a coin per letter
+    cased = np.array([[name.upper(), name.lower(), name.title()] for name in names], dtype=object)
+    modes = rng.choice(4, size=n, p=[0.3, 0.3, 0.35, 0.05])
+    s = cased[name_ids, np.minimum(modes, 2)]
+    mixed = np.flatnonzero(modes == 3)
+    upper = _code_points([name.upper() for name in names])
+    lower = _code_points([name.lower() for name in names])
+    if upper.shape == lower.shape == _code_points(names).shape:
+        coins = rng.random((len(mixed), upper.shape[1])) < 0.5
+        s[mixed] = _from_code_points(np.where(coins, upper[name_ids[mixed]], lower[name_ids[mixed]]))
+    else:
+        # a name whose case mapping changes its length, letter by letter like random_case_variant
+        for i in mixed:
+            name = names[name_ids[i]]
+            coins = rng.random(len(name)) < 0.5
+            s[i] = "".join(ch.upper() if coin else ch.lower() for ch, coin in zip(name, coins))
+
+    # typos: 10% of the names with 4+ characters, one character deleted or replaced by a random letter
+    lengths = np.array([[len(name) for name in row] for row in cased])[name_ids, np.minimum(modes, 2)]
+    lengths[mixed] = [len(s[i]) for i in mixed]
+    typo_rows = np.flatnonzero((lengths >= 4) & (rng.random(n) <= 0.1))
+    if len(typo_rows):
+        chars = _code_points(s[typo_rows].tolist())
+        rows = np.arange(len(typo_rows))
+        positions = (rng.random(len(typo_rows)) * lengths[typo_rows]).astype(np.int64)
+        deletes = rng.random(len(typo_rows)) < 0.5
+        letters = np.frombuffer(b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz", dtype=np.uint8)
+        chars[rows, positions] = letters[rng.integers(0, 52, len(typo_rows))]
+        # a delete shifts everything after the position one to the left
+        columns = np.arange(chars.shape[1])
+        source = columns + (deletes[:, None] & (columns >= positions[:, None]))
+        chars = np.take_along_axis(np.pad(chars, ((0, 0), (0, 1))), source, axis=1)
+        s[typo_rows] = _from_code_points(chars)
+
+    prefixes = np.array([""] * 20 + ["#", "PAYPAL*", "SQ*", "UBER-", "POS ", "ACH "], dtype=object)
+    suffixes = np.array([""] * 20 + [" INC", " LTD", ".COM", " (ONLINE)", " [AUTO]", " *PMT"], dtype=object)
+    s = prefixes[rng.integers(0, len(prefixes), n)] + s + suffixes[rng.integers(0, len(suffixes), n)]
+
+    # regex noise on 20%, token before or after
+    noise_tokens = np.array([".*", "?", "+", "()", "[]", "[TRIP]", "(EATS)", ".*UBR"], dtype=object)
+    noisy = np.flatnonzero(rng.random(n) <= 0.2)
+    tokens = noise_tokens[rng.integers(0, len(noise_tokens), len(noisy))]
+    before = rng.random(len(noisy)) < 0.5
+    s[noisy] = np.where(before, tokens + " " + s[noisy], s[noisy] + " " + tokens)
+
+    # maybe_add_spaces: leading, trailing, then doubled spaces (a string without spaces stays the same)
+    spaces = np.array(["", " "], dtype=object)
+    s = spaces[(rng.random(n) < 0.2).astype(np.int64)] + s + spaces[(rng.random(n) < 0.2).astype(np.int64)]
+    doubled = np.flatnonzero(rng.random(n) < 0.3)
+    s[doubled] = [name.replace(" ", "  ") for name in s[doubled]]
+
+    # none of the added noise has a comma, quote or line break, so only a catalog name can need quoting
+    if any(ch in name for name in names for ch in ',"\r\n'):
+        s = _csv_column(s)
+    return s
+
+# same choices as format_amount_mixed, the text is built from tables of every whole dollar amount up to 2500
+def _bulk_amounts(rng, n: int):
+    import numpy as np
+
+    base = rng.uniform(1, 2500, n)
+    negative = rng.random(n) < 0.05
+    whole = rng.random(n) < 0.2
+    comma = rng.random(n) < 0.5
+
+    # whole amounts round like round(), decimals like f"{base:.2f}"
+    cents = np.where(whole, np.rint(base) * 100, np.rint(base * 100)).astype(np.int64)
+    dollars, fraction = np.divmod(cents, 100)
+    plain = np.array([str(i) for i in range(2501)], dtype=object)
+    commas = np.array([f"{i:,}" for i in range(2501)], dtype=object)
+    fractions = np.array([f".{i:02d}" for i in range(100)] + [""], dtype=object)
+    signs = np.array(["", "-"], dtype=object)
+    num = (
+        signs[negative.astype(np.int64)]
+        + np.where(comma, commas[dollars], plain[dollars])
+        + fractions[np.where(whole, 100, fraction)]
+    )
+
+    # currency style (plain, dollar, usd_before, usd_after) and its space coin
+    before = np.array(["", "", "$", "$ ", "USD ", "USD", "", ""], dtype=object)
+    after = np.array(["", "", "", "", "", "", " USD", "USD"], dtype=object)
+    style = rng.integers(0, 4, n) * 2 + (rng.random(n) < 0.5)
+    spaces = np.array(["", " "], dtype=object)
+    s = (
+        spaces[(rng.random(n) < 0.1).astype(np.int64)]
+        + before[style] + num + after[style]
+        + spaces[(rng.random(n) < 0.1).astype(np.int64)]
+    )
+    # a thousands comma means csv quotes
+    quoted = np.flatnonzero(comma & (dollars >= 1000))
+    s[quoted] = '"' + s[quoted] + '"'
+    return s
+
+# num_rows csv rows (no header) as text, one chunk per batch of at most batch_rows rows,
+# written the way csv.writer writes them
+def iter_bulk_csv(num_rows: int, batch_rows: int = BULK_BATCH_ROWS):
+    import numpy as np
+
+    rng = np.random.default_rng(random.getrandbits(64))
+    date_table = _bulk_date_table()
+    for start in range(0, num_rows, batch_rows):
+        n = min(batch_rows, num_rows - start)
+        dates = _bulk_dates(rng, n, date_table)
+        merchants = _bulk_merchants(rng, n)
+        amounts = _bulk_amounts(rng, n)
+        yield "".join((dates + "," + merchants + "," + amounts + "\r\n").tolist())
+
+
 # Main CSV Generation, bringing it all together
-def main(num_rows: int = 1000):
-    with open(OUTPUT_FILE, mode="w", newline="", encoding="utf-8") as f:
+# background_compression=True compresses a compressed OUTPUT_FILE in a second thread while rows are generated
+# bulk=True generates the rows with iter_bulk_csv (NumPy), same noise model and much faster for big files
+def main(num_rows: int = 1000, background_compression: bool = False, bulk: bool = False):
+    with compressedio.open_text(OUTPUT_FILE, "w", background_compression) as f:
         writer = csv.writer(f)
 
         # header row
         writer.writerow(["date", "merchant", "amount"])
 
-        for _ in range(num_rows):
-            d = random_date()
-            date_str = format_date_mixed(d)
-            merchant_str = random_merchant()
-            amount_str = format_amount_mixed()
+        if bulk:
+            for chunk in iter_bulk_csv(num_rows):
+                f.write(chunk)
+        else:
+            for _ in range(num_rows):
+                d = random_date()
+                date_str = format_date_mixed(d)
+                merchant_str = random_merchant()
+                amount_str = format_amount_mixed()
 
-            writer.writerow([date_str, merchant_str, amount_str])
+                writer.writerow([date_str, merchant_str, amount_str])
 
     print(f"Synthetic, error-filled CSV generated successfully with {num_rows} rows.")
 
@@ -335,7 +542,7 @@ def creation_demo():
             print("Row count must be a positive integer.")
             return False
 
-        main(num_rows)  
+        main(num_rows, bulk=num_rows >= BULK_MIN_ROWS)
         return True
 
     except ValueError:
@@ -349,11 +556,12 @@ if __name__ == "__main__":
 # In[121]:
 
 
-#quick check
-import pandas as pd
+#quick check, only when run directly so importing the module (tests, the pipeline) doesn't need the csv
+if __name__ == "__main__":
+    import pandas as pd
 
-df = pd.read_csv('../datasets/synthetic_transactions.csv')
-df.head(50)
+    df = pd.read_csv('../datasets/synthetic_transactions.csv')
+    print(df.head(50))
 
 
 # In[ ]:
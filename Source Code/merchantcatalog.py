@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from typing import Callable, Dict, Optional, Tuple
+
+# The merchant catalog lives in one json file shared by datacreation and datacleaning.
+# Every family has its noisy name variants and either "brand": true (cleans to the family key) or a
+# "group" (the category datacreation picks it under, cleans to its own name).
+# A compiled artifact next to it keeps everything precomputed (grouped names, and whatever indexes the
+# modules ask for, like datacleaning's matchers). It's only rebuilt when the catalog file's hash,
+# ARTIFACT_FORMAT, or an index's version changes, so startup stays flat as the catalog grows.
+
+CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "merchant_catalog.json")
+ARTIFACT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "merchant_catalog.compiled.pkl")
+
+# bump when the layout of the compiled artifact changes
+ARTIFACT_FORMAT = 1
+
+# compiled artifact per catalog file for this process, loaded on first use
+_compiled: Dict[str, Dict] = {}
+
+
+# sha256 of the raw catalog file
+def source_hash(path: str = CATALOG_FILE) -> str:
+    with open(path, mode="rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+# everything both modules need straight from the json, no indexes yet
+def _compile_source(path: str, digest: str) -> Dict:
+    with open(path, mode="r", encoding="utf-8") as f:
+        source = json.load(f)
+
+    base_merchants: Dict[str, list] = {}
+    brand_keys = []
+    creation_merchants: Dict[str, list] = {}
+    for entry in source["merchants"]:
+        family = entry["family"]
+        names = list(entry["names"])
+        base_merchants[family] = names
+        if entry.get("brand"):
+            brand_keys.append(family)
+        # brands are their own category when generating, the rest share their group
+        creation_merchants.setdefault(entry.get("group", family), []).extend(names)
+
+    return {
+        "format": ARTIFACT_FORMAT,
+        "source_hash": digest,
+        "version": f"v{source.get('version', 0)}-{digest[:12]}",
+        "base_merchants": base_merchants,
+        "brand_keys": brand_keys,
+        "creation_merchants": creation_merchants,
+        "indexes": {},
+    }
+
+
+# written to a temp file first so a crash or a second process never sees half an artifact
+# a read only install just keeps the compiled catalog in memory
+def _write_artifact(compiled: Dict, path: str) -> None:
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        fd, tmp_path = tempfile.mkstemp(prefix=".catalog_", dir=directory)
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, mode="wb") as f:
+            pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # mkstemp files are private, the artifact is as readable as the catalog it came from
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _read_artifact(path: str) -> Optional[Dict]:
+    try:
+        with open(path, mode="rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+
+
+# the compiled catalog, loading or rebuilding the artifact when needed
+# indexes: name -> (version, builder), builder gets the compiled catalog and returns the index data.
+# Missing or out of date indexes are built and saved with the artifact, the others are reused as they are
+def load_compiled(
+    indexes: Optional[Dict[str, Tuple[int, Callable[[Dict], object]]]] = None,
+    catalog_file: str = CATALOG_FILE,
+    artifact_file: str = ARTIFACT_FILE,
+) -> Dict:
+    indexes = indexes or {}
+
+    compiled = _compiled.get(catalog_file)
+    if compiled is None:
+        digest = source_hash(catalog_file)
+        compiled = _read_artifact(artifact_file)
+        if compiled is None or compiled.get("format") != ARTIFACT_FORMAT or compiled.get("source_hash") != digest:
+            compiled = _compile_source(catalog_file, digest)
+            _write_artifact(compiled, artifact_file)
+        _compiled[catalog_file] = compiled
+
+    stale = [
+        name for name, (version, _) in indexes.items()
+        if compiled["indexes"].get(name, {}).get("version") != version
+    ]
+    if stale:
+        for name in stale:
+            version, build = indexes[name]
+            compiled["indexes"][name] = {"version": version, "data": build(compiled)}
+        _write_artifact(compiled, artifact_file)
+
+    return compiled
+
+
+# forgets the compiled catalogs of this process, the next load_compiled checks the file hash again
+# (e.g. after editing the catalog during a session)
+def reset() -> None:
+    _compiled.clear()
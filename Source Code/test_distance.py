@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+import random
+import unittest
+
+import datacleaning
+import datacreation
+
+# The fuzzy pass must score the same with every distance backend: myers_levenshtein against the plain
+# levenshtein table, and bounded_levenshtein keeping its budget contract (the exact distance when it is
+# at most max_dist, max_dist + 1 otherwise). The inputs come from datacreation's own typo model,
+# compared against every canonical base of the catalog.
+# Run from this folder: python -m unittest test_distance (no data files needed)
+
+SEED = 20240131
+TYPO_VARIANTS = 3
+BUDGETS = range(0, 5)
+
+
+# a typo the generator would make: maybe_add_typos only fires 10% of the time, so ask until it does
+def _typo(name: str) -> str:
+    for _ in range(1000):
+        typo = datacreation.maybe_add_typos(name)
+        if typo != name:
+            return typo
+    return name
+
+# canonical strings of catalog names with typos, of whole noisy merchants, and of both repeated past
+# MYERS_MAX_LEN (myers_levenshtein hands those to levenshtein)
+def _inputs() -> list:
+    random.seed(SEED)
+    names = [name for family in datacreation._base_merchants().values() for name in family]
+    inputs = [_typo(name) for name in names for _ in range(TYPO_VARIANTS)]
+    inputs += [datacreation.random_merchant() for _ in range(200)]
+    long_length = datacleaning.MYERS_MAX_LEN + 10
+    inputs += [_typo(name * (long_length // len(name) + 1)) for name in names[::4]]
+    return [datacleaning._canonical_string(s) for s in inputs]
+
+
+class DistanceTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.inputs = _inputs()
+        cls.bases = [canon for canon, _ in datacleaning.canonical_bases()]
+
+    def test_inputs_cover_long_strings(self):
+        self.assertTrue(any(len(s) > datacleaning.MYERS_MAX_LEN for s in self.inputs))
+
+    def test_myers_matches_levenshtein(self):
+        for s in self.inputs:
+            for base in self.bases:
+                expected = datacleaning.levenshtein(s, base)
+                self.assertEqual(datacleaning.myers_levenshtein(s, base), expected, (s, base))
+                self.assertEqual(datacleaning.myers_levenshtein(base, s), expected, (base, s))
+
+    def test_bounded_levenshtein_budget(self):
+        for s in self.inputs:
+            for base in self.bases:
+                distance = datacleaning.levenshtein(s, base)
+                for max_dist in BUDGETS:
+                    expected = distance if distance <= max_dist else max_dist + 1
+                    self.assertEqual(datacleaning.bounded_levenshtein(s, base, max_dist), expected, (s, base, max_dist))
+
+    def test_backend_scorers_agree(self):
+        for s in self.inputs:
+            scorers = {name: make(s) for name, make in datacleaning.DISTANCE_BACKENDS.items()}
+            for base in self.bases:
+                distance = datacleaning.levenshtein(s, base)
+                for max_dist in BUDGETS:
+                    for name, score in scorers.items():
+                        result = score(base, max_dist)
+                        if distance <= max_dist:
+                            self.assertEqual(result, distance, (name, s, base, max_dist))
+                        else:
+                            self.assertGreater(result, max_dist, (name, s, base, max_dist))
+
+
+if __name__ == "__main__":
+    unittest.main()
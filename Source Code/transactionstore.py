@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+from array import array
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Union
+
+# Compact columnar storage for cleaned transactions
+# A cleaned row as a dict of three strings takes 400+ bytes, here one row is 14 bytes in three typed arrays:
+# - days: int32 date ordinal (date.toordinal(), so date.fromordinal gives the date back)
+# - merchant_ids: uint16 index into the merchants table (every merchant string is stored once)
+# - cents: int64 amount in cents
+# numpy, pandas and pyarrow are only needed for to_dataframe / to_arrow, so they're imported there
+
+# datetime64 counts days from 1970-01-01, date ordinals from 0001-01-01
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class TransactionStore:
+    __slots__ = ("days", "merchant_ids", "cents", "merchants", "_merchant_index")
+
+    def __init__(self, merchants: Optional[List[str]] = None):
+        self.days = array("i")
+        self.merchant_ids = array("H")
+        self.cents = array("q")
+        # the merchant table can be shared with slices, ids stay valid since merchants are only ever added
+        self.merchants: List[str] = merchants if merchants is not None else []
+        self._merchant_index: Dict[str, int] = {m: i for i, m in enumerate(self.merchants)}
+
+    # merchant id for a name, added to the table the first time (at most 65536 distinct merchants)
+    def merchant_id(self, merchant: str) -> int:
+        merchant_id = self._merchant_index.get(merchant)
+        if merchant_id is None:
+            merchant_id = len(self.merchants)
+            if merchant_id > 0xFFFF:
+                raise OverflowError("TransactionStore holds at most 65536 distinct merchants")
+            self.merchants.append(merchant)
+            self._merchant_index[merchant] = merchant_id
+        return merchant_id
+
+    def append(self, day: int, merchant: str, cents: int) -> None:
+        self.days.append(day)
+        self.merchant_ids.append(self.merchant_id(merchant))
+        self.cents.append(cents)
+
+    # a cleaned row as clean_csv writes it ({"date": "2024-01-31", "merchant": "UBER", "amount": "-12.50"})
+    def append_row(self, row: Dict[str, str]) -> None:
+        amount = row["amount"]
+        # cleaned amounts always have exactly two decimals, so dropping the dot gives the cents
+        self.append(date.fromisoformat(row["date"]).toordinal(), row["merchant"], int(amount.replace(".", "", 1)))
+
+    @classmethod
+    def from_rows(cls, rows) -> "TransactionStore":
+        store = cls()
+        for row in rows:
+            store.append_row(row)
+        return store
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    # one row back in the cleaned row format
+    def row(self, i: int) -> Dict[str, str]:
+        cents = self.cents[i]
+        sign = "-" if cents < 0 else ""
+        return {
+            "date": date.fromordinal(self.days[i]).isoformat(),
+            "merchant": self.merchants[self.merchant_ids[i]],
+            "amount": sign + "%d.%02d" % divmod(abs(cents), 100),
+        }
+
+    # rows as cleaned row dicts, built one at a time
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        for i in range(len(self.days)):
+            yield self.row(i)
+
+    # store[i] is a cleaned row dict, store[a:b] a new store over the same merchant table
+    def __getitem__(self, key: Union[int, slice]):
+        if isinstance(key, slice):
+            part = TransactionStore(self.merchants)
+            part._merchant_index = self._merchant_index
+            part.days = self.days[key]
+            part.merchant_ids = self.merchant_ids[key]
+            part.cents = self.cents[key]
+            return part
+        return self.row(key)
+
+    # bytes used by the three columns (the merchant table is extra but tiny)
+    def nbytes(self) -> int:
+        return sum(col.itemsize * len(col) for col in (self.days, self.merchant_ids, self.cents))
+
+    # DataFrame with date (datetime64), merchant (categorical over the merchant table) and amount_cents (int64)
+    # amount_cents is a view on the store's buffer, no copy. While the frame is alive the store can't grow
+    # (array raises BufferError), take a .copy() of the frame if more rows will be appended
+    def to_dataframe(self):
+        import numpy as np
+        import pandas as pd
+
+        days = np.frombuffer(self.days, dtype=np.int32)
+        codes = np.frombuffer(self.merchant_ids, dtype=np.uint16)
+        cents = np.frombuffer(self.cents, dtype=np.int64)
+
+        dates = (days - _EPOCH_ORDINAL).astype("datetime64[D]").astype("datetime64[s]")
+        merchants = pd.Categorical.from_codes(codes.astype(np.int32), categories=self.merchants)
+        return pd.DataFrame({"date": dates, "merchant": merchants, "amount_cents": cents}, copy=False)
+
+    # pyarrow table for the columnar output files: date (date32), merchant (dictionary encoded over the
+    # merchant table) and amount_cents (int64, the exact cents, no binary rounding like float dollars)
+    # the dictionary is written sorted, so grouping the categorical comes out in the same order as strings
+    def to_arrow(self):
+        import numpy as np
+        import pyarrow as pa
+
+        days = np.frombuffer(self.days, dtype=np.int32) - np.int32(_EPOCH_ORDINAL)
+        codes = np.frombuffer(self.merchant_ids, dtype=np.uint16)
+        cents = np.frombuffer(self.cents, dtype=np.int64)
+
+        order = sorted(range(len(self.merchants)), key=self.merchants.__getitem__)
+        rank = np.empty(len(order), dtype=np.uint16)
+        rank[order] = np.arange(len(order), dtype=np.uint16)
+        dictionary = pa.array([self.merchants[i] for i in order], type=pa.string())
+
+        return pa.table({
+            "date": pa.array(days, type=pa.date32()),
+            "merchant": pa.DictionaryArray.from_arrays(pa.array(rank[codes]), dictionary),
+            "amount_cents": pa.array(cents),
+        })